@@ -1,17 +1,38 @@
-import time
-import pyautogui
-import random
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, scrolledtext
-import keyboard
+from tkinter import filedialog, messagebox, ttk
 import threading
-from PIL import Image, ImageTk
 import os
+from paged_editor import PagedEditor
+import session_stats
+from typing_engine import (StopSignal, TypingEngine, PyAutoGUIBackend, PasteBackend, configure_backend,
+                           compile_plan, format_duration, iter_words, system_clipboard)
+
+# Slider and switch defaults, also used by "Reset to Defaults"
+OPTION_DEFAULTS = {
+    "delay_var": 0.3,
+    "typo_var": 0.03,
+    "delete_var": 0.15,
+    "pause_var": 0.1,
+    "throughput_cps_var": 0,
+    "throughput_var": False,
+    "paste_var": True,
+    "profile_var": False,
+}
 
 class AutoTyperApp:
     def __init__(self, root):
         self.root = root
-        self.stop_typing = False
+        self.stop_signal = StopSignal()
+        self.last_report = None
+        self.engine = None
+        self.session_error = None
+        self.profiler = None
+        self.job_queue = None
+        self.plan_cache = None
+        self.progress_window = None
+        # What the last full run left on screen, so "Apply Edits" can type only the changes
+        self.emit_record = None
+        self.session_words = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -20,15 +41,11 @@ class AutoTyperApp:
         self.root.geometry("800x700")
         self.root.minsize(700, 800)
         
-        # Try to load custom logo
-        try:
-            logo_path = os.path.join(os.path.dirname(__file__), "logo.ico")
-            if os.path.exists(logo_path):
-                logo_img = Image.open(logo_path)
-                logo = ImageTk.PhotoImage(logo_img)
-                self.root.iconphoto(True, logo)
-        except Exception as e:
-            print(f"Failed to load logo: {e}")
+        # The logo needs PIL, which is slow to import, so load it once the window is up
+        self.root.after_idle(self.load_logo)
+        
+        # Setting variables exist up front; the Options tab widgets are built on demand
+        self.setup_variables()
         
         # Set up custom style
         self.setup_style()
@@ -55,10 +72,13 @@ class AutoTyperApp:
         self.notebook.add(self.info_frame, text="Info")
         self.notebook.pack(expand=True, fill="both")
         
-        # Setup tab content
+        # Setup tab content; Options and Info are only built the first time they are shown
         self.setup_main_tab()
-        self.setup_options_tab()
-        self.setup_info_tab()
+        self.lazy_tabs = {
+            str(self.options_frame): self.setup_options_tab,
+            str(self.info_frame): self.setup_info_tab,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Add footer
         footer_frame = ttk.Frame(main_container, style="Footer.TFrame")
@@ -67,6 +87,28 @@ class AutoTyperApp:
         version_label = ttk.Label(footer_frame, text="v1.0.1 - Jfreaky", style="FooterText.TLabel")
         version_label.pack(side="right", padx=10)
         
+    def load_logo(self):
+        # Try to load custom logo
+        try:
+            from PIL import Image, ImageTk
+            logo_path = os.path.join(os.path.dirname(__file__), "logo.ico")
+            if os.path.exists(logo_path):
+                logo_img = Image.open(logo_path)
+                self.logo = ImageTk.PhotoImage(logo_img)
+                self.root.iconphoto(True, self.logo)
+        except Exception as e:
+            print(f"Failed to load logo: {e}")
+    
+    def setup_variables(self):
+        for var_name, default in OPTION_DEFAULTS.items():
+            var_type = tk.BooleanVar if isinstance(default, bool) else tk.DoubleVar
+            setattr(self, var_name, var_type(value=default))
+    
+    def on_tab_changed(self, event):
+        setup = self.lazy_tabs.pop(self.notebook.select(), None)
+        if setup:
+            setup()
+    
     def setup_style(self):
         # Define colors
         self.primary_color = "#4285F4"  # Google blue
@@ -173,12 +215,19 @@ class AutoTyperApp:
         editor_frame = ttk.Frame(self.main_frame, style="Tab.TFrame")
         editor_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Add a label as header for the editor
-        editor_header = ttk.Label(editor_frame, text="Edit Content", style="TLabel")
-        editor_header.pack(anchor="w", padx=5, pady=(0, 5))
+        # Add a label as header for the editor, with room for open/save progress
+        header_frame = ttk.Frame(editor_frame, style="Tab.TFrame")
+        header_frame.pack(fill="x", padx=5, pady=(0, 5))
+        
+        editor_header = ttk.Label(header_frame, text="Edit Content", style="TLabel")
+        editor_header.pack(side="left")
+        
+        self.io_bar = ttk.Progressbar(header_frame, length=160, maximum=100, mode="determinate")
+        self.io_label = ttk.Label(header_frame, text="", foreground="#5F6368")
+        self.io_label.pack(side="right")
         
-        # Text editor with custom styling
-        self.editor = scrolledtext.ScrolledText(
+        # Paged text editor with custom styling; only the visible pages live in the widget
+        self.editor = PagedEditor(
             editor_frame, 
             wrap=tk.WORD, 
             font=("Google Sans", 12),
@@ -202,11 +251,45 @@ class AutoTyperApp:
                               width=15)
         save_btn.pack(side="left", padx=5)
         
+        # Streaming reads straight from the file instead of the editor, for very large documents
+        self.stream_var = tk.BooleanVar(value=False)
+        stream_check = ttk.Checkbutton(action_frame, text="Stream from file",
+                                       variable=self.stream_var)
+        stream_check.pack(side="left", padx=10)
+        
+        export_btn = ttk.Button(action_frame, text="Export Stats", 
+                                command=self.export_stats, 
+                                style="Secondary.TButton",
+                                width=15)
+        export_btn.pack(side="left", padx=5)
+        
         start_btn = ttk.Button(action_frame, text="▶ Start Typing", 
                                command=self.start_typing, 
                                style="Accent.TButton",
                                width=20)
         start_btn.pack(side="right", padx=5)
+        
+        # Queued jobs survive restarts and resume from their last checkpoint
+        queue_frame = ttk.Frame(self.main_frame, style="Tab.TFrame")
+        queue_frame.pack(fill="x", pady=(0, 15), padx=10)
+        
+        queue_btn = ttk.Button(queue_frame, text="Add to Queue", 
+                               command=self.add_to_queue, 
+                               style="Secondary.TButton",
+                               width=15)
+        queue_btn.pack(side="left", padx=5)
+        
+        run_queue_btn = ttk.Button(queue_frame, text="Run Queue", 
+                                   command=self.run_queue, 
+                                   style="Secondary.TButton",
+                                   width=15)
+        run_queue_btn.pack(side="left", padx=5)
+        
+        edits_btn = ttk.Button(queue_frame, text="Apply Edits", 
+                               command=self.apply_edits, 
+                               style="Secondary.TButton",
+                               width=15)
+        edits_btn.pack(side="right", padx=5)
     
     def setup_options_tab(self):
         options_content = ttk.Frame(self.options_frame, style="Tab.TFrame")
@@ -224,16 +307,32 @@ class AutoTyperApp:
         
         # Option rows with sliders
         self.setup_slider_option(card_frame, 1, "Delay between words (seconds):", 
-                                 0.1, 2.0, 0.3, "delay_var")
+                                 0.1, 2.0, "delay_var")
         
         self.setup_slider_option(card_frame, 2, "Typo Chance:", 
-                                 0.0, 0.2, 0.03, "typo_var")
+                                 0.0, 0.2, "typo_var")
         
         self.setup_slider_option(card_frame, 3, "Delete Chance:", 
-                                 0.0, 0.3, 0.15, "delete_var")
+                                 0.0, 0.3, "delete_var")
         
         self.setup_slider_option(card_frame, 4, "Pause Chance:", 
-                                 0.0, 0.3, 0.1, "pause_var")
+                                 0.0, 0.3, "pause_var")
+        
+        # Max throughput mode skips the humanized behavior and types in large batches
+        self.setup_slider_option(card_frame, 5, "Max throughput chars/sec (0 = unlimited):", 
+                                 0, 2000, "throughput_cps_var")
+        
+        throughput_check = ttk.Checkbutton(card_frame, text="Max throughput mode",
+                                           variable=self.throughput_var)
+        throughput_check.grid(row=6, column=0, columnspan=3, sticky="w", padx=10, pady=10)
+        
+        paste_check = ttk.Checkbutton(card_frame, text="Paste characters that can't be typed (accents, symbols, emoji)",
+                                      variable=self.paste_var)
+        paste_check.grid(row=7, column=0, columnspan=3, sticky="w", padx=10, pady=10)
+        
+        profile_check = ttk.Checkbutton(card_frame, text="Profile typing sessions (saves a flamegraph and pstats file)",
+                                        variable=self.profile_var)
+        profile_check.grid(row=8, column=0, columnspan=3, sticky="w", padx=10, pady=10)
         
         # Descriptive text
         desc_frame = ttk.Frame(options_content, style="Tab.TFrame")
@@ -244,7 +343,9 @@ class AutoTyperApp:
 • Higher delay values make typing slower, lower values make it faster
 • Typo chance adds occasional errors that are immediately corrected
 • Delete chance simulates rethinking and rewriting parts of text
-• Pause chance adds natural breaks in typing rhythm"""
+• Pause chance adds natural breaks in typing rhythm
+• Max throughput mode ignores the settings above and types as fast as the target allows, or at the chars/sec target
+• Pasting sends characters the keyboard can't type through the clipboard (restored afterwards); in max throughput mode whole batches are pasted"""
         
         desc_label = ttk.Label(desc_frame, text=desc_text, 
                               wraplength=600, 
@@ -262,14 +363,13 @@ class AutoTyperApp:
                               width=20)
         reset_btn.pack(side="right", padx=10)
     
-    def setup_slider_option(self, parent, row, label_text, min_val, max_val, default, var_name):
+    def setup_slider_option(self, parent, row, label_text, min_val, max_val, var_name):
         # Create label
         label = ttk.Label(parent, text=label_text)
         label.grid(row=row, column=0, sticky="w", padx=10, pady=10)
         
-        # Create variable and store it as an instance attribute
-        var = tk.DoubleVar(value=default)
-        setattr(self, var_name, var)
+        # Variable was created by setup_variables
+        var = getattr(self, var_name)
         
         # Create slider
         slider = ttk.Scale(parent, from_=min_val, to=max_val, 
@@ -358,23 +458,29 @@ Ctrl+N - Clear the editor""")
         content_label.pack(anchor="w")
     
     def browse_file(self):
+        if self.editor.busy():
+            messagebox.showerror("Error", "Wait for the current open or save to finish.")
+            return
         file_path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
         if file_path:
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, file_path)
             
-            # Load file content
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    self.editor.delete("1.0", tk.END)
-                    self.editor.insert(tk.END, content)
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not read file: {e}")
+            # In streaming mode the file is typed straight from disk, so don't load it
+            if self.stream_var.get():
+                return
+            
+            # Load file content off the Tk thread; the editor stays read-only until it's in
+            self.show_io_status("Opening...")
+            self.editor.load_file_async(file_path, lambda error: self.io_finished(error, "Could not read file"))
     
     def save_file_content(self):
+        if self.editor.busy():
+            messagebox.showerror("Error", "Wait for the current open or save to finish.")
+            return
         path = self.file_entry.get()
-        if not path:
+        # Only write over the file the editor actually holds; a streamed file is never loaded
+        if not path or (os.path.exists(path) and not self.editor.holds(path)):
             # If no file is selected, open save dialog
             path = filedialog.asksaveasfilename(
                 defaultextension=".txt",
@@ -385,119 +491,324 @@ Ctrl+N - Clear the editor""")
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, path)
             
-        try:
-            with open(path, 'w', encoding='utf-8') as file:
-                file.write(self.editor.get("1.0", tk.END))
-            messagebox.showinfo("Success", "File saved successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not save file: {e}")
+        # Written to a temp file in the background, then renamed over the original
+        saving = self.editor.save_async(
+            path, self.show_io_progress,
+            lambda error: self.io_finished(error, "Could not save file", "File saved successfully!"))
+        if not saving:
+            messagebox.showinfo("Save File", "No changes to save.")
+            return
+        self.show_io_status("Saving...")
+    
+    def show_io_status(self, text):
+        self.io_bar['value'] = 0
+        self.io_bar.pack(side="right", padx=(5, 0))
+        self.io_label.config(text=text)
+    
+    def show_io_progress(self, written, total):
+        fraction = written / total if total else 1.0
+        self.io_bar['value'] = fraction * 100
+        self.io_label.config(text=f"Saving... {fraction * 100:.0f}%")
+    
+    def io_finished(self, error, failure, success=None):
+        self.io_bar.pack_forget()
+        self.io_label.config(text="")
+        if error is not None:
+            messagebox.showerror("Error", f"{failure}: {error}")
+        elif success:
+            messagebox.showinfo("Success", success)
     
     def reset_options(self):
         # Reset all options to defaults
-        self.delay_var.set(0.3)
-        self.typo_var.set(0.03)
-        self.delete_var.set(0.15)
-        self.pause_var.set(0.1)
+        for var_name, default in OPTION_DEFAULTS.items():
+            getattr(self, var_name).set(default)
     
     def start_typing(self):
-        # Get content from editor
-        content = self.editor.get("1.0", tk.END).strip()
-        if not content:
-            messagebox.showerror("Error", "No content to type.")
-            return
-        
         # Get values from sliders
         delay = self.delay_var.get()
         typo = self.typo_var.get()
         delete = self.delete_var.get()
         pause = self.pause_var.get()
+        throughput = self.throughput_var.get()
+        cps = self.throughput_cps_var.get()
+        session_words = None
+        
+        if self.stream_var.get():
+            # Stream the file from disk; the plan is compiled chunk by chunk while typing
+            path = self.file_entry.get()
+            if not os.path.isfile(path):
+                messagebox.showerror("Error", "Select a file to stream.")
+                return
+            estimate = "unknown (streaming)"
+            total_words = None
+            if throughput:
+                job = lambda engine: engine.run_throughput(iter_words(path), cps)
+            else:
+                job = lambda engine: engine.stream(path, delay, delete, typo, pause)
+        else:
+            # Words come from the plan cache, so retyping the same text skips tokenizing
+            words = self.get_plan_cache().words(self.editor.get_bytes())[1]
+            if not len(words):
+                messagebox.showerror("Error", "No content to type.")
+                return
+            
+            total_words = len(words)
+            if throughput:
+                estimate = format_duration(3 + words.typed_length() / cps) if cps else "as fast as possible"
+                job = lambda engine: engine.run_throughput(words, cps)
+            else:
+                # Roll all typos, pauses and rewinds up front so the duration is known
+                plan = compile_plan(words, delay, delete, typo, pause)
+                estimate = format_duration(plan.duration(3))
+                job = lambda engine: engine.execute(plan)
+                session_words = words
         
         # Confirm start typing
         result = messagebox.askokcancel(
             "Start Typing", 
             "Click OK, then quickly click into your target document.\n"
             "Typing will begin in 3 seconds.\n\n"
+            f"Estimated duration: {estimate}\n\n"
             "Press ESC at any time to stop typing."
         )
         
         if not result:
             return
             
-        # Start typing in a separate thread
+        # Start typing in a separate thread. The old record no longer describes the target;
+        # a plain humanized run leaves a new one, any other kind leaves none
+        self.emit_record = None
+        self.session_words = session_words
+        paste = self.paste_enabled()
+        self.root.withdraw()
+        self.show_progress(total_words)
+        typing_thread = threading.Thread(
+            target=self.slow_write_to_word,
+            args=(job, throughput, paste, self.profile_var.get())
+        )
+        typing_thread.daemon = True
+        typing_thread.start()
+    
+    def current_settings(self):
+        return {
+            "delay": self.delay_var.get(),
+            "delete": self.delete_var.get(),
+            "typo": self.typo_var.get(),
+            "pause": self.pause_var.get(),
+            "throughput": self.throughput_var.get(),
+            "cps": self.throughput_cps_var.get(),
+        }
+    
+    def get_job_queue(self):
+        # Created on first use so the state directory is only made when the queue is used
+        if self.job_queue is None:
+            from job_queue import JobQueue
+            self.job_queue = JobQueue()
+        return self.job_queue
+    
+    def get_plan_cache(self):
+        if self.plan_cache is None:
+            from plan_cache import PlanCache
+            self.plan_cache = PlanCache()
+        return self.plan_cache
+    
+    def add_to_queue(self):
+        settings = self.current_settings()
+        try:
+            path = self.file_entry.get()
+            if self.stream_var.get():
+                if not os.path.isfile(path):
+                    messagebox.showerror("Error", "Select a file to stream.")
+                    return
+                self.get_job_queue().add_file(path, **settings)
+            else:
+                content = self.editor.get_text().strip()
+                if not content:
+                    messagebox.showerror("Error", "No content to type.")
+                    return
+                self.get_job_queue().add_text(content, **settings)
+            pending = len(self.get_job_queue().pending())
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not queue job: {e}")
+            return
+        messagebox.showinfo("Queued", f"Job added. {pending} job(s) waiting in the queue.")
+    
+    def run_queue(self):
+        queue = self.get_job_queue()
+        pending = queue.pending()
+        if not pending:
+            messagebox.showinfo("Queue", "The queue is empty.")
+            return
+        resumed = sum(1 for job in pending if job.offset)
+        result = messagebox.askokcancel(
+            "Run Queue", 
+            f"{len(pending)} job(s) queued, {resumed} resuming from a checkpoint.\n"
+            "Click OK, then quickly click into your target document.\n"
+            "Typing will begin in 3 seconds.\n\n"
+            "Press ESC at any time to stop; the queue resumes where it left off."
+        )
+        if not result:
+            return
+        
+        def job(engine):
+            # Each job carries its own settings, so the backend pause follows the job's mode
+            def on_job(queued):
+                configure_backend(engine.backend, queued.settings["throughput"])
+            return queue.run(engine, on_job=on_job)
+        
+        # Queue runs type other documents, so Apply Edits has nothing valid to diff against
+        self.emit_record = None
+        self.session_words = None
+        paste = self.paste_enabled()
+        self.root.withdraw()
+        self.show_progress()
+        typing_thread = threading.Thread(
+            target=self.slow_write_to_word,
+            args=(job, False, paste, self.profile_var.get())
+        )
+        typing_thread.daemon = True
+        typing_thread.start()
+    
+    def apply_edits(self):
+        from continuation import continue_typing, diff_words
+        record = self.emit_record
+        if record is None:
+            messagebox.showerror("Error", "Type the document once first; Apply Edits types only what changed since.")
+            return
+        words = list(self.get_plan_cache().words(self.editor.get_bytes())[1])
+        changes = len(diff_words(record.words, words))
+        if not changes and not record.stray:
+            messagebox.showinfo("Apply Edits", "The text matches what was typed last time.")
+            return
+        result = messagebox.askokcancel(
+            "Apply Edits", 
+            f"{changes} change(s) since the last run.\n"
+            "Click OK, then quickly click into the same document, which must hold only the typed text.\n"
+            "Editing will begin in 3 seconds.\n\n"
+            "Press ESC at any time to stop; Apply Edits picks up where it left off."
+        )
+        if not result:
+            return
+        
+        settings = self.current_settings()
+        # The record is updated as keystrokes go out, so a stopped run leaves it accurate
+        job = lambda engine: continue_typing(engine, record, words, settings["delay"], settings["delete"],
+                                             settings["typo"], settings["pause"])
+        self.session_words = None
+        paste = self.paste_enabled()
         self.root.withdraw()
+        self.show_progress()
         typing_thread = threading.Thread(
             target=self.slow_write_to_word,
-            args=(content, delay, delete, typo, pause)
+            args=(job, False, paste, self.profile_var.get())
         )
         typing_thread.daemon = True
         typing_thread.start()
     
-    def slow_write_to_word(self, content, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1):
-        self.stop_typing = False
+    def show_progress(self, total_words=None):
+        from progress_window import ProgressFeed, ProgressWindow
+        # The typing thread only pushes snapshots; the window drains them on a fixed timer
+        self.progress_feed = ProgressFeed()
+        self.progress_window = ProgressWindow(self.root, self.progress_feed, total_words)
+    
+    def paste_enabled(self):
+        # Checked before typing starts: without a clipboard the first paste would fail mid-session
+        if not self.paste_var.get():
+            return False
+        if system_clipboard() is None:
+            messagebox.showwarning(
+                "No Clipboard",
+                "No clipboard is available (on Linux, install xclip or xsel).\n"
+                "Characters the keyboard can't type will be skipped.")
+            return False
+        return True
+    
+    def slow_write_to_word(self, job, throughput=False, paste=True, profile=False):
+        self.profiler = None
+        self.engine = None
+        self.session_error = None
+        try:
+            if profile:
+                # Only imported and installed when asked for, so normal sessions pay nothing
+                from profiling import SessionProfiler
+                self.profiler = SessionProfiler()
+                with self.profiler:
+                    self.type_job(job, throughput, paste)
+            else:
+                self.type_job(job, throughput, paste)
+        except Exception as e:
+            self.session_error = e
+        finally:
+            # Show the app again when finished, even if typing failed
+            self.root.after(0, self.show_complete_message)
+    
+    def type_job(self, job, throughput, paste):
+        import keyboard
+        stop = self.stop_signal = StopSignal()
         
         # Start listening for ESC key
-        stop_thread = threading.Thread(target=self.listen_for_stop)
-        stop_thread.daemon = True
-        stop_thread.start()
-        
-        # Wait 3 seconds before starting to type
-        time.sleep(3)
-        
-        words = content.split()
-        typed_text = []
-        
-        for word in words:
-            if self.stop_typing:
-                break
-                
-            # Simulate typo
-            if random.random() < typo_chance:
-                typo_word = word[:-1] + random.choice('abcdefghijklmnopqrstuvwxyz')
-                pyautogui.write(typo_word + ' ')
-                time.sleep(0.5)
-                pyautogui.hotkey('ctrl', 'backspace')
-                time.sleep(0.7)
-            
-            # Type the word
-            pyautogui.write(word + ' ')
-            typed_text.append(word)
-            time.sleep(delay)
-            
-            if self.stop_typing:
-                break
-                
-            # Add random pauses
-            if random.random() < pause_chance:
-                time.sleep(random.uniform(2, 5))
-                
-            # Randomly delete and retype
-            if random.random() < delete_chance and len(typed_text) > 10:
-                delete_count = min(10, len(typed_text))
-                for _ in range(delete_count):
-                    pyautogui.hotkey('ctrl', 'backspace')
-                    typed_text.pop()
-                time.sleep(1.5)
-                for word in typed_text[-delete_count:]:
-                    pyautogui.write(word + ' ')
-                    time.sleep(delay)
-                    if self.stop_typing:
-                        break
-        
-        # Show the app again when finished
-        self.root.after(0, self.show_complete_message)
+        hook = self.listen_for_stop(stop)
+        try:
+            backend = PyAutoGUIBackend()
+            if paste:
+                # pyautogui drops characters it has no key for; those go through the clipboard
+                backend = PasteBackend(backend)
+            # In max throughput mode pyautogui's per-call pause is skipped
+            configure_backend(backend, throughput)
+            engine = self.engine = TypingEngine(backend, stop)
+            engine.on_progress = self.progress_feed.push
+            job(engine)
+        finally:
+            keyboard.unhook(hook)
     
-    def listen_for_stop(self):
-        while not self.stop_typing:
-            if keyboard.is_pressed('esc'):
-                self.stop_typing = True
-                break
+    def listen_for_stop(self, stop):
+        import keyboard
+        # Keyboard hook runs on the keyboard library's own thread; no polling needed
+        return keyboard.on_press_key('esc', lambda event: stop.set())
     
     def show_complete_message(self):
+        if self.progress_window is not None:
+            self.progress_window.close()
+            self.progress_window = None
         self.root.deiconify()
-        if self.stop_typing:
-            messagebox.showinfo("Stopped", "Typing was stopped by user.")
+        if self.engine is None:
+            # Failed before typing could start
+            self.session_words = None
+            messagebox.showerror("Error", f"Typing failed: {self.session_error}")
+            return
+        if self.session_words is not None:
+            from continuation import EmitRecord
+            self.emit_record = EmitRecord.from_session(self.session_words, self.engine)
+            self.session_words = None
+        report = self.last_report = self.engine.report()
+        stats_text = (f"{session_stats.format_summary(report)}\n"
+                      f"Planned time: {format_duration(report['timing']['planned_seconds'])}, "
+                      f"actual: {format_duration(report['elapsed_seconds'])}")
+        if self.profiler is not None and self.profiler.paths:
+            stats_text += "\n\nProfile saved to:\n" + "\n".join(self.profiler.paths)
+        if self.session_error is not None:
+            messagebox.showerror("Error", f"Typing failed: {self.session_error}\n\n{stats_text}")
+        elif self.stop_signal.is_set():
+            latency = self.stop_signal.stop_latency()
+            messagebox.showinfo("Stopped", "Typing was stopped by user.\n\n"
+                                f"Stop latency: {latency * 1000:.1f} ms\n{stats_text}")
         else:
-            messagebox.showinfo("Complete", "Typing completed successfully!")
+            messagebox.showinfo("Complete", f"Typing completed successfully!\n\n{stats_text}")
+    
+    def export_stats(self):
+        if self.last_report is None:
+            messagebox.showerror("Error", "No typing session to export yet.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Prometheus text", "*.prom")]
+        )
+        if not path:  # User cancelled
+            return
+        try:
+            session_stats.export(self.last_report, path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export stats: {e}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,207 @@
+import time
+import weakref
+import asyncio
+
+from typing_engine import TypingEngine, DeadlineScheduler, PasteBackend, MAX_LAG, iter_words
+
+# One per event loop: every session on a loop shares the one system clipboard
+CLIPBOARD_LOCKS = weakref.WeakKeyDictionary()
+
+
+class EmitPause(float):
+    # A backend pause (pyautogui's per-call pause, paste settle time) yielded by a session
+    # step; awaited as is, outside the schedule, just as the threaded engine blocks for it
+    pass
+
+
+def clipboard_lock():
+    loop = asyncio.get_running_loop()
+    lock = CLIPBOARD_LOCKS.get(loop)
+    if lock is None:
+        lock = CLIPBOARD_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+
+class AsyncDeadlineScheduler(DeadlineScheduler):
+    # Same deadline bookkeeping as DeadlineScheduler, but waits are awaited on the
+    # event loop and stopping is done by cancelling the session task
+    async def wait(self, seconds):
+        seconds *= self.time_scale
+        if seconds <= 0:
+            # Still yield, so other sessions and the UI get a turn between emits
+            await asyncio.sleep(0)
+            return self.stop.is_set()
+        self.planned += seconds
+        self.deadline += seconds
+        before = self.clock()
+        try:
+            if self.deadline > before:
+                await asyncio.sleep(self.deadline - before)
+        finally:
+            self.slept += self.clock() - before
+        now = self.clock()
+        self.record(now - self.deadline)
+        self.deadline = max(self.deadline, now - MAX_LAG)
+        return self.stop.is_set()
+
+
+class AsyncTypingEngine(TypingEngine):
+    # asyncio variant of TypingEngine: one session is one task, every delay is an await,
+    # and progress can be consumed as an async stream with events(). Keys are still sent
+    # synchronously, but the pauses backends would sleep through are awaited instead.
+    def __init__(self, backend=None, stop=None, seed=None, time_scale=1.0):
+        super().__init__(backend, stop, seed, time_scale)
+        self.scheduler = AsyncDeadlineScheduler(self.stop, time_scale)
+        self.task = None
+        self.loop = None
+        self.listeners = []
+
+    def start(self, job):
+        # Runs job(engine) -> coroutine as a task on the running loop and returns the task
+        self.loop = asyncio.get_running_loop()
+        self.task = self.loop.create_task(self.run_session(job))
+        return self.task
+
+    async def run_session(self, job):
+        finished = False
+        try:
+            finished = await job(self)
+            return finished
+        except asyncio.CancelledError:
+            self.stop.set()
+            raise
+        finally:
+            # Always end the event stream, even if the job raised
+            self.publish("done" if finished else "stopped")
+
+    def cancel(self):
+        # Safe to call from any thread, e.g. a keyboard hook
+        self.stop.set()
+        if self.task is not None:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+
+    def publish(self, kind):
+        if not self.listeners:
+            return
+        event = {
+            "kind": kind,
+            "words": self.stats.words,
+            "words_done": self.words_done(),
+            "chars": self.stats.chars,
+            "elapsed_seconds": self.scheduler.clock() - self.scheduler.started,
+        }
+        for queue in self.listeners:
+            queue.put_nowait(event)
+
+    async def events(self):
+        # Yields a progress event after each word (or batch), then a final "done" or
+        # "stopped" event. Each consumer gets its own queue, so a slow one only lags itself.
+        queue = asyncio.Queue()
+        self.listeners.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event["kind"] != "progress":
+                    return
+        finally:
+            self.listeners.remove(queue)
+
+    def progress(self):
+        super().progress()
+        self.publish("progress")
+
+    async def wait(self, seconds):
+        return await self.scheduler.wait(seconds)
+
+    async def run(self, content, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1,
+                  start_delay=3):
+        return await self.execute(self.plan(content, delay, delete_chance, typo_chance, pause_chance),
+                                  start_delay)
+
+    async def stream(self, path, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1,
+                     start_delay=3):
+        return await self.stream_words(iter_words(path), delay, delete_chance, typo_chance, pause_chance,
+                                       start_delay)
+
+    async def stream_words(self, words, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1,
+                           start_delay=3):
+        return await self.drive(self.stream_steps(words, delay, delete_chance, typo_chance, pause_chance,
+                                                  start_delay))
+
+    async def run_throughput(self, words, chars_per_second=0, start_delay=3):
+        return await self.drive(self.throughput_steps(words, chars_per_second, start_delay))
+
+    async def execute(self, plan, start_delay=3, new_session=True):
+        return await self.drive(self.plan_steps(plan, start_delay, new_session))
+
+    async def drive(self, steps):
+        # Same steps as the threaded engine; only the waits are awaited
+        try:
+            for wait in steps:
+                if type(wait) is EmitPause:
+                    await asyncio.sleep(wait)
+                elif not isinstance(wait, (int, float)):
+                    # Something to wait for besides time, e.g. the clipboard
+                    await wait
+                elif await self.wait(wait):
+                    return False
+            return True
+        finally:
+            # On cancel, lets a half-done paste put the user's clipboard back
+            steps.close()
+
+    def emit(self, text):
+        started = time.perf_counter()
+        backend = self.backend
+        if not (isinstance(backend, PasteBackend) and backend.needs_paste(text)):
+            for pause in backend.write_steps(text):
+                yield EmitPause(pause)
+        else:
+            # Another session could set the clipboard while this one waits for its paste to be
+            # read, so pastes take turns; the clipboard is restored before the next one starts
+            lock = clipboard_lock()
+            yield lock.acquire()
+            try:
+                for pause in backend.write_steps(text):
+                    yield EmitPause(pause)
+            finally:
+                lock.release()
+        self.wrote(started, text)
+
+    def delete_steps(self):
+        started = time.perf_counter()
+        for pause in self.backend.hotkey_steps('ctrl', 'backspace'):
+            yield EmitPause(pause)
+        self.pressed(started)
+        self.stats.backspaces += 1
+
+
+async def type_session(engine, job, listen_esc=False, on_event=None):
+    # asyncio counterpart of the GUI's slow_write_to_word: runs job(engine) as a cancellable
+    # task, optionally cancelled by ESC, and feeds each progress event to on_event.
+    # Returns True if the job finished, False if it was stopped.
+    hook = None
+    task = None
+    if listen_esc:
+        import keyboard
+        hook = keyboard.on_press_key('esc', lambda event: engine.cancel())
+    try:
+        events = engine.events()
+        task = engine.start(job)
+        async for event in events:
+            if on_event is not None:
+                on_event(event)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # Only swallow the session's own cancellation, not our caller's
+            if not engine.stop.is_set():
+                raise
+            return False
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+        if hook is not None:
+            import keyboard
+            keyboard.unhook(hook)
@@ -0,0 +1,261 @@
+import os
+import sys
+import argparse
+import threading
+
+# Headless entry point: only the engine is imported here, never tkinter or PIL
+from typing_engine import (StopSignal, TypingEngine, PyAutoGUIBackend, PasteBackend, LocalClipboard, BACKENDS,
+                           configure_backend, compile_plan, format_duration, iter_words, system_clipboard)
+from plan_cache import PlanCache, WordList, DEFAULT_CACHE_DIR, tokenize, map_file
+import session_stats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="autotyper_cli",
+        description="Type a text file into the focused window without the Auto Typer GUI.")
+    parser.add_argument("file", nargs="?", help="UTF-8 text file to type")
+    parser.add_argument("--delay", type=float, default=0.3, help="delay between words in seconds")
+    parser.add_argument("--typo", type=float, default=0.03, help="typo chance")
+    parser.add_argument("--delete", type=float, default=0.15, help="delete-and-retype chance")
+    parser.add_argument("--pause", type=float, default=0.1, help="pause chance")
+    parser.add_argument("--seed", type=int, help="seed for reproducible typos and pauses")
+    parser.add_argument("--start-delay", type=float, default=3, help="seconds to wait before typing")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the file as it is typed (constant memory, no duration estimate)")
+    parser.add_argument("--throughput", action="store_true",
+                        help="max throughput mode: no typos or pauses, batched writes")
+    parser.add_argument("--cps", type=float, default=0,
+                        help="chars/sec target for max throughput mode (0 = unlimited)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pyautogui",
+                        help="where keystrokes go; 'null' and 'recording' need no display")
+    parser.add_argument("--no-paste", action="store_true",
+                        help="never use the clipboard; characters the keyboard can't type are dropped")
+    parser.add_argument("--esc", action="store_true",
+                        help="also stop on ESC (needs the keyboard package); Ctrl+C always stops")
+    parser.add_argument("--stats-out", help="write session stats here (.json, or .prom for Prometheus)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't read or write the on-disk cache of tokenized text and seeded plans")
+    parser.add_argument("--cache-dir", help="plan cache directory (default ~/.autotyper/cache)")
+    parser.add_argument("--dry-run", action="store_true", help="print the planned duration and exit")
+    parser.add_argument("--queue", action="store_true",
+                        help="add the file and settings to the job queue instead of typing it")
+    parser.add_argument("--run-queue", action="store_true",
+                        help="type every queued job, resuming interrupted ones from their checkpoint")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="profile the session and write .collapsed and .pstats files to DIR "
+                             "(default ~/.autotyper/profiles)")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="run the session as an asyncio task instead of on a worker thread")
+    parser.add_argument("--state-dir", help="job queue directory (default ~/.autotyper)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save which words ended up on screen, for a later --continue-from")
+    parser.add_argument("--continue-from", metavar="PATH",
+                        help="apply only the differences between the record at PATH and the file, "
+                             "then update the record")
+    return parser
+
+
+def make_job(args, record=None):
+    # Returns (job, estimate, words) where job(engine) runs the session; words is None when streaming
+    settings = (args.delay, args.delete, args.typo, args.pause)
+    cache = None if args.no_cache or args.stream else PlanCache(args.cache_dir or DEFAULT_CACHE_DIR)
+    if args.throughput and args.stream:
+        stream = iter_words(args.file)
+        job = lambda engine: engine.run_throughput(stream, args.cps, args.start_delay)
+        estimate = None
+        words = None
+    elif args.throughput:
+        data = map_file(args.file)
+        words = cache.words(data)[1] if cache else WordList(data, tokenize(data))
+        job = lambda engine: engine.run_throughput(words, args.cps, args.start_delay)
+        estimate = args.start_delay + words.typed_length() / args.cps if args.cps else None
+    elif args.stream:
+        job = lambda engine: engine.stream(args.file, *settings, args.start_delay)
+        estimate = None
+        words = None
+    elif record is not None:
+        from continuation import continue_typing
+        data = map_file(args.file)
+        words = list(cache.words(data)[1] if cache else WordList(data, tokenize(data)))
+        # continue_typing updates the record in place as the edits go out
+        job = lambda engine: continue_typing(engine, record, words, *settings, args.start_delay)
+        estimate = None
+    elif cache:
+        # With --seed the whole plan comes from the cache on repeat runs
+        plan = cache.plan(map_file(args.file), *settings, args.seed)
+        job = lambda engine: engine.execute(plan, args.start_delay)
+        estimate = plan.duration(args.start_delay)
+        words = plan.words
+    else:
+        data = map_file(args.file)
+        words = WordList(data, tokenize(data))
+        plan = compile_plan(words, *settings, args.seed)
+        job = lambda engine: engine.execute(plan, args.start_delay)
+        estimate = plan.duration(args.start_delay)
+    return job, estimate, words
+
+
+def open_queue(args):
+    from job_queue import JobQueue, DEFAULT_STATE_DIR
+    return JobQueue(args.state_dir or DEFAULT_STATE_DIR)
+
+
+def make_queue_job(args, queue):
+    def job(engine):
+        def on_job(queued):
+            print(f"Job {queued.id}: {queued.path} from word {queued.offset}")
+            configure_backend(engine.backend, queued.settings["throughput"])
+        return queue.run(engine, args.start_delay, on_job)
+    return job
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    record = words = None
+    if not args.file and not args.run_queue:
+        parser.error("a file is required unless --run-queue is given")
+    if args.run_queue and args.asyncio:
+        parser.error("--asyncio does not support --run-queue")
+    if (args.record or args.continue_from) and (args.stream or args.throughput or args.queue or args.run_queue):
+        parser.error("--record and --continue-from only work with a plain humanized run")
+    if args.continue_from and args.asyncio:
+        parser.error("--asyncio does not support --continue-from")
+    if args.run_queue:
+        queue = open_queue(args)
+        pending = queue.pending()
+        print(f"Queued jobs: {len(pending)}")
+        if args.dry_run or not pending:
+            return 0
+        job = make_queue_job(args, queue)
+    elif not os.path.isfile(args.file):
+        print(f"Error: {args.file} is not a file", file=sys.stderr)
+        return 2
+    elif args.queue:
+        settings = {"delay": args.delay, "delete": args.delete, "typo": args.typo, "pause": args.pause,
+                    "throughput": args.throughput, "cps": args.cps}
+        queued = open_queue(args).add_file(args.file, **settings)
+        print(f"Queued job {queued.id}")
+        return 0
+    else:
+        if args.continue_from:
+            from continuation import EmitRecord
+            try:
+                record = EmitRecord.load(args.continue_from)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error: can't read {args.continue_from}: {e}", file=sys.stderr)
+                return 2
+        job, estimate, words = make_job(args, record)
+        print(f"Estimated duration: {format_duration(estimate) if estimate is not None else 'unknown'}")
+        if args.dry_run:
+            return 0
+
+    stop = StopSignal()
+    if args.backend == "pyautogui":
+        backend = PyAutoGUIBackend()
+        clipboard = None if args.no_paste else system_clipboard()
+        if clipboard is not None:
+            backend = PasteBackend(backend, clipboard)
+        elif not args.no_paste:
+            print("Warning: no clipboard available; characters the keyboard can't type will be dropped",
+                  file=sys.stderr)
+    else:
+        backend = BACKENDS[args.backend]()
+        if not args.no_paste:
+            # Nothing reads the clipboard here, so an in-memory one keeps the path exercised
+            backend = PasteBackend(backend, LocalClipboard(), settle=0)
+    # Max throughput mode skips pyautogui's per-call pause and pastes whole batches
+    configure_backend(backend, args.throughput)
+
+    profiler = None
+    if args.profile is not None:
+        from profiling import SessionProfiler, DEFAULT_PROFILE_DIR
+        profiler = SessionProfiler(args.profile or DEFAULT_PROFILE_DIR)
+
+    if args.asyncio:
+        import asyncio
+        from async_engine import AsyncTypingEngine, type_session
+        engine = AsyncTypingEngine(backend, stop, seed=args.seed)
+        error = None
+        try:
+            # asyncio.run cancels the session task on Ctrl+C
+            if profiler is not None:
+                with profiler:
+                    asyncio.run(type_session(engine, job, args.esc))
+            else:
+                asyncio.run(type_session(engine, job, args.esc))
+        except KeyboardInterrupt:
+            stop.set()
+        except Exception as e:
+            error = e
+        return finish(engine, args, profiler, save_record(engine, args, words, record), error)
+
+    if profiler is not None:
+        from profiling import profiled
+        # cProfile traces one thread, so the profiler has to be entered on the worker
+        job = profiled(job, profiler)
+
+    engine = TypingEngine(backend, stop, seed=args.seed)
+
+    unhook = None
+    if args.esc:
+        import keyboard
+        hook = keyboard.on_press_key('esc', lambda event: stop.set())
+        unhook = lambda: keyboard.unhook(hook)
+
+    # The engine runs on a worker so Ctrl+C in the main thread can stop it cleanly
+    errors = []
+
+    def run():
+        try:
+            job(engine)
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.2)
+    except KeyboardInterrupt:
+        stop.set()
+        worker.join()
+    finally:
+        if unhook:
+            unhook()
+    return finish(engine, args, profiler, save_record(engine, args, words, record), errors[0] if errors else None)
+
+
+def save_record(engine, args, words, record):
+    # Returns the path the emit record went to, if one was asked for
+    path = args.record or args.continue_from
+    if not path:
+        return None
+    if record is None:
+        from continuation import EmitRecord
+        record = EmitRecord.from_session(words, engine)
+    record.save(path)
+    return path
+
+
+def finish(engine, args, profiler=None, record_path=None, error=None):
+    report = engine.report()
+    if error is not None:
+        print(f"Failed: {type(error).__name__}: {error}", file=sys.stderr)
+    else:
+        print("Stopped." if engine.stop.is_set() else "Complete.")
+    print(session_stats.format_summary(report))
+    if args.stats_out:
+        session_stats.export(report, args.stats_out)
+    if profiler is not None and profiler.paths:
+        print("Profile: " + ", ".join(profiler.paths))
+    if record_path:
+        print(f"Record: {record_path}")
+    if error is not None:
+        return 1
+    return 130 if engine.stop.is_set() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+
+from typing_engine import (TypingEngine, StopSignal, NullBackend, RecordingBackend, PyAutoGUIBackend,
+                           compile_plan)
+
+# Bump when a benchmark changes meaning, so old JSON results aren't compared against new ones
+SUITE_VERSION = 1
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Snippets timed in a fresh interpreter by bench_startup
+GUI_IMPORT = "import runpy; runpy.run_path('Auto Typer.py', run_name='autotyper_gui')"
+GUI_LAUNCH = ("import runpy; gui = runpy.run_path('Auto Typer.py', run_name='autotyper_gui'); "
+              "root = gui['tk'].Tk(); gui['AutoTyperApp'](root); root.update(); root.destroy()")
+
+SAMPLE_TEXT = ("The quick brown fox jumps over the lazy dog while the typist keeps a steady "
+               "rhythm, pausing now and then to rethink a sentence before carrying on.\n")
+
+
+def make_text_file(directory, size_mb):
+    # Writes a plain text file of roughly `size_mb` megabytes
+    path = os.path.join(directory, f"bench_{size_mb}mb.txt")
+    block = SAMPLE_TEXT * 1024
+    target = int(size_mb * 1024 * 1024)
+    with open(path, 'w', encoding='utf-8') as file:
+        written = 0
+        while written < target:
+            file.write(block)
+            written += len(block)
+    return path
+
+
+def sample_words(word_count):
+    words = SAMPLE_TEXT.split()
+    return (words * (word_count // len(words) + 1))[:word_count]
+
+
+def measure_peak(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, elapsed
+
+
+def bench_engine_overhead(word_count):
+    # Cost of the engine itself with every wait skipped and a sink that does nothing
+    words = sample_words(word_count)
+    start = time.perf_counter()
+    plan = compile_plan(words, rng=0)
+    compile_seconds = time.perf_counter() - start
+
+    engine = TypingEngine(NullBackend(), time_scale=0)
+    start = time.perf_counter()
+    engine.execute(plan, start_delay=0)
+    execute_seconds = time.perf_counter() - start
+
+    return {
+        "words": word_count,
+        "actions": len(plan),
+        "compile_us_per_word": compile_seconds / word_count * 1e6,
+        "execute_us_per_word": execute_seconds / word_count * 1e6,
+        "execute_us_per_action": execute_seconds / len(plan) * 1e6,
+    }
+
+
+def bench_stop_latency(trials, delay=0.05):
+    # Starts a real-time session, requests a stop at a random moment and measures how
+    # long the engine takes to notice: keypress to last keystroke, and to thread exit
+    emit_latency = []
+    exit_latency = []
+    content = ' '.join(sample_words(2000))
+    for trial in range(trials):
+        stop = StopSignal()
+        engine = TypingEngine(RecordingBackend(), stop, seed=trial)
+        thread = threading.Thread(target=engine.run, args=(content, delay), kwargs={"start_delay": 0})
+        thread.start()
+        time.sleep(random.uniform(0.05, 0.25))
+        stop.set()
+        thread.join()
+        exit_latency.append(time.perf_counter() - stop.pressed_at)
+        emit_latency.append(stop.stop_latency())
+
+    return {
+        "trials": trials,
+        "emit_latency_max_ms": max(emit_latency) * 1000,
+        "exit_latency_mean_ms": statistics.mean(exit_latency) * 1000,
+        "exit_latency_max_ms": max(exit_latency) * 1000,
+    }
+
+
+def bench_schedule(word_count, delay=0.3, time_scale=0.002):
+    # Runs a word_count-word plan with waits compressed by time_scale and compares the
+    # real running time with the planned one
+    plan = compile_plan(sample_words(word_count), delay, rng=0)
+    engine = TypingEngine(NullBackend(), time_scale=time_scale)
+    engine.execute(plan, start_delay=0)
+    result = engine.scheduler.report()
+    result["words"] = word_count
+    result["delay"] = delay
+    result["error_percent"] = 100 * result["drift_seconds"] / result["planned_seconds"]
+    return result
+
+
+def bench_throughput(make_backend, word_count, target_cps=2000):
+    # Achieved chars/sec for the humanized path (every setting at zero) and for
+    # max throughput mode, unlimited and paced to target_cps
+    words = sample_words(word_count)
+    chars = sum(len(word) + 1 for word in words)
+    results = {"words": word_count, "chars": chars}
+
+    def timed(func):
+        start = time.perf_counter()
+        func()
+        return chars / (time.perf_counter() - start)
+
+    plan = compile_plan(words, 0, 0, 0, 0, rng=0)
+    results["humanized_cps"] = timed(
+        lambda: TypingEngine(make_backend(True)).execute(plan, start_delay=0))
+    results["throughput_cps"] = timed(
+        lambda: TypingEngine(make_backend(False)).run_throughput(words, start_delay=0))
+    results["target_cps"] = target_cps
+    results["paced_cps"] = timed(
+        lambda: TypingEngine(make_backend(False)).run_throughput(words, target_cps, start_delay=0))
+    return results
+
+
+def bench_memory(size_mb, compare_loaded=True):
+    # Peak Python heap while typing a file of `size_mb` MB, streamed vs fully loaded
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_text_file(directory, size_mb)
+
+        def streamed():
+            TypingEngine(NullBackend(), seed=0, time_scale=0).stream(path, start_delay=0)
+
+        def loaded():
+            with open(path, 'r', encoding='utf-8') as file:
+                content = file.read()
+            TypingEngine(NullBackend(), seed=0, time_scale=0).run(content, start_delay=0)
+
+        result = {"size_mb": size_mb}
+        result["stream_peak_bytes"], result["stream_seconds"] = measure_peak(streamed)
+        if compare_loaded:
+            result["loaded_peak_bytes"], result["loaded_seconds"] = measure_peak(loaded)
+    return result
+
+
+def bench_ui_load(size_mb):
+    # Time to open a large file in the paged editor. The document side always runs;
+    # the Tk widget is only timed when a display is available.
+    from paged_editor import PagedDocument, PagedEditor, PAGE_BYTES, WINDOW_PAGES
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_text_file(directory, size_mb)
+        result = {"size_mb": size_mb}
+
+        start = time.perf_counter()
+        document = PagedDocument(path)
+        document.read_text(0, document.boundary(WINDOW_PAGES * PAGE_BYTES))
+        result["document_open_ms"] = (time.perf_counter() - start) * 1000
+        document.close()
+
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:
+            result["widget_load_ms"] = None
+            result["widget_skipped"] = str(e)
+            return result
+        try:
+            root.withdraw()
+            editor = PagedEditor(root)
+            editor.pack()
+            start = time.perf_counter()
+            editor.load_file(path)
+            root.update_idletasks()
+            result["widget_load_ms"] = (time.perf_counter() - start) * 1000
+            editor.document.close()
+        finally:
+            root.destroy()
+    return result
+
+
+def time_command(command, repeats):
+    # Median wall time of `command` in a fresh process, or None if it fails (e.g. no display)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def bench_startup(repeats):
+    # Import and launch cost of the headless CLI against the Tk GUI, in milliseconds
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "startup.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(SAMPLE_TEXT)
+        cli_launch = [python, "autotyper_cli.py", path, "--backend", "null", "--start-delay", "0",
+                      "--delay", "0", "--typo", "0", "--delete", "0", "--pause", "0"]
+        return {
+            "python_ms": time_command([python, "-c", "pass"], repeats),
+            "cli_import_ms": time_command([python, "-c", "import autotyper_cli"], repeats),
+            "cli_launch_ms": time_command(cli_launch, repeats),
+            "gui_import_ms": time_command([python, "-c", GUI_IMPORT], repeats),
+            "gui_launch_ms": time_command([python, "-c", GUI_LAUNCH], repeats),
+        }
+
+
+def run_suite(args):
+    results = {}
+
+    result = results["engine_overhead"] = bench_engine_overhead(args.words)
+    print(f"Engine overhead, {result['words']} words: compile {result['compile_us_per_word']:.2f} us/word, "
+          f"execute {result['execute_us_per_word']:.2f} us/word")
+
+    result = results["stop_latency"] = bench_stop_latency(args.stop_trials)
+    print(f"Stop latency, {result['trials']} trials: last keystroke within "
+          f"{result['emit_latency_max_ms']:.2f} ms, engine exit {result['exit_latency_mean_ms']:.2f} ms "
+          f"(max {result['exit_latency_max_ms']:.2f} ms)")
+
+    results["schedule"] = []
+    for delay in args.delays:
+        result = bench_schedule(args.words, delay)
+        results["schedule"].append(result)
+        print(f"Scheduling, {result['words']} words at {delay}s delay: "
+              f"planned {result['planned_seconds']:.3f}s, actual {result['elapsed_seconds']:.3f}s "
+              f"({result['error_percent']:+.3f}%), jitter {result['jitter_mean_ms']:.2f} "
+              f"+/- {result['jitter_stdev_ms']:.2f} ms")
+
+    backends = [("recording", lambda pause: RecordingBackend(), 20000, 50000)]
+    if args.real_backend:
+        backends.append(("pyautogui", lambda pause: PyAutoGUIBackend(pause), 200, 500))
+    results["throughput"] = {}
+    for name, make_backend, word_count, target_cps in backends:
+        result = results["throughput"][name] = bench_throughput(make_backend, word_count, target_cps)
+        print(f"Throughput via {name}, {result['chars']} chars: "
+              f"humanized {result['humanized_cps']:.0f} chars/s, "
+              f"max throughput {result['throughput_cps']:.0f} chars/s, "
+              f"paced {result['paced_cps']:.0f}/{result['target_cps']} chars/s")
+
+    result = results["startup"] = bench_startup(args.startup_repeats)
+    labels = ("python", "CLI import", "CLI launch", "GUI import", "GUI launch")
+    print("Startup: " + ", ".join(f"{label} {value:.0f} ms" if value is not None else f"{label} n/a"
+                                  for label, value in zip(labels, result.values())))
+
+    results["memory"] = []
+    for size_mb in args.sizes:
+        # Loading the whole document is the thing being avoided, so only do it while it fits
+        result = bench_memory(size_mb, compare_loaded=size_mb <= args.loaded_max_mb)
+        results["memory"].append(result)
+        line = f"Memory, {size_mb:g} MB: streamed peak {result['stream_peak_bytes'] / 1024:.0f} KB"
+        if "loaded_peak_bytes" in result:
+            line += f", fully loaded peak {result['loaded_peak_bytes'] / 1024:.0f} KB"
+        print(line)
+
+    results["ui_load"] = []
+    for size_mb in args.sizes:
+        result = bench_ui_load(size_mb)
+        results["ui_load"].append(result)
+        widget = result["widget_load_ms"]
+        widget_text = f"{widget:.1f} ms" if widget is not None else "skipped (no display)"
+        print(f"UI load, {size_mb:g} MB: document {result['document_open_ms']:.1f} ms, widget {widget_text}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto Typer engine benchmarks")
+    parser.add_argument("--words", type=int, default=10000,
+                        help="word count for the overhead and scheduling benchmarks")
+    parser.add_argument("--delays", type=float, nargs="+", default=[0.1, 0.3, 1.0],
+                        help="word delays for the scheduling accuracy benchmark")
+    parser.add_argument("--stop-trials", type=int, default=20,
+                        help="number of stop latency trials")
+    parser.add_argument("--startup-repeats", type=int, default=5,
+                        help="runs per command for the startup benchmark")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 100],
+                        help="input sizes in MB for the memory and UI load benchmarks")
+    parser.add_argument("--loaded-max-mb", type=float, default=10,
+                        help="largest size for which the fully loaded path is also measured")
+    parser.add_argument("--real-backend", action="store_true",
+                        help="also measure throughput through pyautogui (types into the focused window)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+
+    if args.output:
+        report = {
+            "suite_version": SUITE_VERSION,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
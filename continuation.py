@@ -0,0 +1,139 @@
+import sys
+import json
+from difflib import SequenceMatcher
+
+from typing_engine import REWIND_WORDS, ScreenModel, compile_plan
+
+# Caret movement used to reach an edit. Ctrl+Left (start of the previous word) and
+# Ctrl+Backspace behave the same in practically every editor; Ctrl+Right only reliably
+# lands on the start of the next word on Windows, so only there is Home + Right used.
+WORD_LEFT = ('ctrl', 'left')
+WORD_RIGHT = ('ctrl', 'right')
+DOC_START = ('ctrl', 'home')
+DOC_END = ('ctrl', 'end')
+FORWARD_WORDS = sys.platform == 'win32'
+
+RECORD_VERSION = 1
+
+
+class EmitRecord:
+    # The words a session left on screen, in order, plus any typo token that was
+    # on screen when it stopped. Assumes the typed text is the whole target document.
+    def __init__(self, words, stray=0):
+        self.words = words
+        self.stray = stray
+
+    @classmethod
+    def from_session(cls, words, engine):
+        typed = list(words[:engine.words_done()])
+        return cls(typed, stray_tokens(engine, typed))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("version") != RECORD_VERSION:
+            raise ValueError(f"{path} is not an emit record this version can read")
+        return cls(data["words"], data["stray"])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"version": RECORD_VERSION, "words": self.words, "stray": self.stray}, file)
+
+
+def stray_tokens(engine, typed):
+    # A run stopped between a typo and its correction leaves the typo on screen
+    tokens = engine.screen.tokens
+    if tokens and (not typed or tokens[-1] != typed[-1] + ' '):
+        return 1
+    return 0
+
+
+def diff_words(old, new):
+    # Non-equal difflib opcodes turning `old` into `new`. The common prefix and suffix
+    # are trimmed first, so a small edit in a long document only diffs the edited span.
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[len(old) - 1 - end] == new[len(new) - 1 - end]:
+        end += 1
+    matcher = SequenceMatcher(None, old[start:len(old) - end], new[start:len(new) - end], autojunk=False)
+    return [(tag, i1 + start, i2 + start, j1 + start, j2 + start)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def move_caret(engine, caret, target):
+    # Caret positions count the words before it; returns the new position
+    back = caret - target
+    if FORWARD_WORDS and target + 1 < back:
+        engine.hotkey(*DOC_START)
+        if target:
+            engine.hotkey(*WORD_RIGHT, count=target)
+    elif back > 0:
+        engine.hotkey(*WORD_LEFT, count=back)
+    return target
+
+
+def continue_typing(engine, record, words, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1,
+                    start_delay=3):
+    # Brings the target from `record` to `words` with the fewest word edits: caret moves,
+    # Ctrl+Backspace deletes and typed inserts, applied from the end backwards so earlier
+    # positions stay valid. Words appended past what was typed (the rest of a stopped job)
+    # are typed with the usual humanized plan. `record` is updated as keystrokes go out,
+    # so it stays accurate if the run is stopped. Returns False if it was stopped.
+    edits = diff_words(record.words, words)
+    remainder = []
+    if edits and edits[-1][0] == 'insert' and edits[-1][1] == len(record.words):
+        remainder = words[edits[-1][3]:]
+        edits.pop()
+
+    engine.begin_session(requested_wpm=60 / delay if delay else None)
+    if engine.wait(start_delay):
+        return False
+
+    screen = record.words = list(record.words)
+    # Clicking into the window to resume may have moved the caret, so start from the end
+    engine.hotkey(*DOC_END)
+    for _ in range(record.stray):
+        engine.delete_word()
+    record.stray = 0
+    caret = len(screen)
+
+    for tag, i1, i2, j1, j2 in reversed(edits):
+        caret = move_caret(engine, caret, i2)
+        while caret > i1:
+            engine.delete_word()
+            caret -= 1
+            del screen[caret]
+            if engine.wait(0):
+                return False
+        for word in words[j1:j2]:
+            engine.write(word + ' ')
+            engine.stats.words += 1
+            screen.insert(caret, word)
+            caret += 1
+            if engine.wait(delay):
+                return False
+
+    if not remainder:
+        return True
+    if caret != len(screen):
+        engine.hotkey(*DOC_END)
+    # Seed the screen model with what precedes the new words, so rewinds retype correctly
+    engine.screen = ScreenModel()
+    for word in screen[-(REWIND_WORDS + 1):]:
+        engine.screen.emit(word + ' ')
+    before = engine.words_done()
+    plan = compile_plan(remainder, delay, delete_chance, typo_chance, pause_chance, engine.rng, len(screen))
+    try:
+        return engine.execute(plan, 0, new_session=False)
+    finally:
+        typed = engine.words_done() - before
+        # A stop part way through a rewind can leave seeded words taken off the screen too
+        if typed >= 0:
+            screen.extend(remainder[:typed])
+        else:
+            del screen[typed:]
+        record.stray = stray_tokens(engine, screen)
@@ -0,0 +1,391 @@
+import os
+import sys
+import time
+import signal
+import select
+import uuid
+import shutil
+import argparse
+import subprocess
+import multiprocessing
+import queue as queue_module
+
+# Headless batch mode: one worker process per X display, so sessions don't share a GIL
+from typing_engine import (StopSignal, TypingEngine, PyAutoGUIBackend, PasteBackend, LocalClipboard, BACKENDS,
+                           configure_backend, iter_words, system_clipboard)
+from job_queue import Job, DEFAULT_SETTINGS
+from session_stats import SessionStats, to_json
+
+XVFB_SCREEN = "1280x800x24"
+XVFB_START_TIMEOUT = 10.0
+# How often a target window writes its text out for --verify
+TARGET_SAVE_MS = 200
+
+
+def make_backend(name, paste):
+    if name == "pyautogui":
+        # Imported after DISPLAY is set, so pyautogui connects to this worker's display
+        backend = PyAutoGUIBackend()
+        if not paste:
+            return backend
+        # Checked here, not on first paste, which would kill the worker part way through a job.
+        # Each X display has its own clipboard, so every worker checks its own.
+        clipboard = system_clipboard()
+        if clipboard is None:
+            print(f"Warning: no clipboard on {os.environ.get('DISPLAY', 'this display')}; "
+                  "characters the keyboard can't type will be dropped", file=sys.stderr)
+            return backend
+        return PasteBackend(backend, clipboard)
+    backend = BACKENDS[name]()
+    return PasteBackend(backend, LocalClipboard(), settle=0) if paste else backend
+
+
+def worker_name(index, display):
+    return display or f"worker-{index}"
+
+
+def worker_main(index, display, jobs, results, stop_event, backend_name, paste, start_delay, time_scale):
+    # Runs in its own process: takes jobs off the shared queue until it gets None or is stopped.
+    # Ctrl+C reaches the whole process group, so it is ignored here and the parent decides.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        if display:
+            os.environ["DISPLAY"] = display
+        stop = StopSignal(stop_event)
+        engine = TypingEngine(make_backend(backend_name, paste), stop, time_scale=time_scale)
+        while not stop.is_set():
+            job = jobs.get()
+            if job is None:
+                break
+            settings = job.settings
+            configure_backend(engine.backend, settings["throughput"])
+            words = iter_words(job.path)
+            if settings["throughput"]:
+                finished = engine.run_throughput(words, settings["cps"], start_delay)
+            else:
+                finished = engine.stream_words(words, settings["delay"], settings["delete"], settings["typo"],
+                                               settings["pause"], start_delay)
+            results.put({"id": job.id, "path": job.path, "worker": worker_name(index, display),
+                         "display": display, "finished": finished, "report": engine.report()})
+    except Exception as e:
+        results.put({"worker": worker_name(index, display), "display": display,
+                     "error": f"{type(e).__name__}: {e}"})
+    finally:
+        # Tells the parent this worker is done
+        results.put(None)
+
+
+class BatchRunner:
+    # Fans jobs out over one worker process per display. Workers pull from a shared queue,
+    # so a display that finishes early picks up the next job; each has its own stop event.
+    def __init__(self, displays, backend="pyautogui", paste=True, start_delay=3, time_scale=1.0):
+        self.displays = displays
+        self.backend = backend
+        self.paste = paste
+        self.start_delay = start_delay
+        self.time_scale = time_scale
+        # spawn, not fork: each worker must import pyautogui fresh against its own DISPLAY
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []
+        self.stopped = False
+
+    def run(self, jobs, on_result=None):
+        jobs_queue = self.context.Queue()
+        results_queue = self.context.Queue()
+        for job in jobs:
+            jobs_queue.put(job)
+        for _ in self.displays:
+            jobs_queue.put(None)
+
+        started = time.perf_counter()
+        for index, display in enumerate(self.displays):
+            stop_event = self.context.Event()
+            process = self.context.Process(
+                target=worker_main,
+                args=(index, display, jobs_queue, results_queue, stop_event, self.backend, self.paste,
+                      self.start_delay, self.time_scale),
+                daemon=True)
+            process.start()
+            self.workers.append((display, stop_event, process))
+
+        results = []
+        running = len(self.workers)
+        while running:
+            try:
+                result = results_queue.get(timeout=0.5)
+            except queue_module.Empty:
+                # A worker killed outright never sends its end marker
+                if not any(process.is_alive() for _, _, process in self.workers):
+                    break
+                continue
+            except KeyboardInterrupt:
+                # Stop every worker but keep collecting, so interrupted jobs are still reported
+                self.stop()
+                continue
+            if result is None:
+                running -= 1
+                continue
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        for _, _, process in self.workers:
+            process.join()
+        return aggregate(results, time.perf_counter() - started)
+
+    def stop(self, display=None):
+        # Stops one display's worker, or all of them
+        self.stopped = True
+        for worker_display, stop_event, _ in self.workers:
+            if display is None or worker_display == display:
+                stop_event.set()
+
+
+def aggregate(results, wall_seconds):
+    totals = {name: 0 for name, _ in SessionStats.COUNTERS}
+    per_worker = {}
+    errors = []
+    for result in results:
+        if "error" in result:
+            errors.append(result)
+            continue
+        report = result["report"]
+        for name in totals:
+            totals[name] += report[name]
+        worker = per_worker.setdefault(result["worker"], {"jobs": 0, "chars": 0, "busy_seconds": 0.0})
+        worker["jobs"] += 1
+        worker["chars"] += report["chars"]
+        worker["busy_seconds"] += report["elapsed_seconds"]
+    jobs = [result for result in results if "error" not in result]
+    summary = {
+        "jobs": len(jobs),
+        "finished": sum(1 for result in jobs if result["finished"]),
+        "wall_seconds": wall_seconds,
+        # Aggregate rate across all displays, which is what scales with worker count
+        "achieved_cps": totals["chars"] / wall_seconds if wall_seconds else 0.0,
+        "achieved_wpm": totals["words"] * 60 / wall_seconds if wall_seconds else 0.0,
+        "workers": per_worker,
+        "errors": errors,
+        "results": jobs,
+    }
+    summary.update(totals)
+    return summary
+
+
+def start_xvfb(count):
+    # Starts `count` Xvfb servers and returns [(display, process)] once they accept clients
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("Xvfb is not installed")
+    servers = []
+    try:
+        for _ in range(count):
+            servers.append(start_one_xvfb())
+    except BaseException:
+        stop_processes(servers)
+        raise
+    return servers
+
+
+def start_one_xvfb():
+    # With -displayfd the server picks a free display number itself and writes it to the
+    # pipe only once it is ready, so a display someone else already runs is never reused
+    read_fd, write_fd = os.pipe()
+    try:
+        process = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", XVFB_SCREEN,
+                                    "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, pass_fds=(write_fd,))
+    finally:
+        os.close(write_fd)
+    output = b''
+    deadline = time.monotonic() + XVFB_START_TIMEOUT
+    try:
+        while not output.endswith(b'\n'):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                break
+            chunk = os.read(read_fd, 16)
+            if not chunk:
+                # The server exited without reporting a display
+                break
+            output += chunk
+    finally:
+        os.close(read_fd)
+    if not output.strip().isdigit() or not output.endswith(b'\n') or process.poll() is not None:
+        stop_processes([(None, process)])
+        raise RuntimeError("Xvfb did not start")
+    return f":{int(output)}", process
+
+
+def stop_processes(processes):
+    for _, process in processes:
+        process.terminate()
+    for _, process in processes:
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def launch_target(display, output_path):
+    # A focused Tk text widget on `display` that keeps saving its contents to output_path
+    env = dict(os.environ, DISPLAY=display)
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--target", output_path], env=env)
+
+
+def target_main(output_path):
+    import tkinter as tk
+    root = tk.Tk()
+    root.geometry("1000x700+0+0")
+    text = tk.Text(root)
+    text.pack(fill="both", expand=True)
+
+    def delete_word(event):
+        # Word-processor Ctrl+Backspace: trailing spaces and the word before them
+        end = "insert"
+        while text.compare(end, ">", "1.0") and text.get(f"{end}-1c").isspace():
+            end = f"{end}-1c"
+        while text.compare(end, ">", "1.0") and not text.get(f"{end}-1c").isspace():
+            end = f"{end}-1c"
+        text.delete(end, "insert")
+        return "break"
+
+    def save():
+        temp_path = output_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(text.get("1.0", "end-1c"))
+        os.replace(temp_path, output_path)
+        root.after(TARGET_SAVE_MS, save)
+
+    text.bind("<Control-BackSpace>", delete_word)
+    root.after(100, text.focus_force)
+    root.after(TARGET_SAVE_MS, save)
+    root.mainloop()
+
+
+def verify(summary, outputs):
+    # Compares each display's typed text with the words of the jobs it ran, in order
+    matches = {}
+    for display, output_path in outputs.items():
+        expected = []
+        for result in summary["results"]:
+            if result["display"] == display and result["finished"]:
+                expected.extend(iter_words(result["path"]))
+        try:
+            with open(output_path, 'r', encoding='utf-8') as file:
+                typed = file.read().split()
+        except OSError:
+            typed = None
+        matches[display] = typed == expected
+    return matches
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="fanout",
+        description="Type a batch of files across several X displays, one worker process per display.")
+    parser.add_argument("files", nargs="*", help="UTF-8 text files, one job each")
+    parser.add_argument("--displays", nargs="+", help="X displays to use, e.g. :1 :2")
+    parser.add_argument("--xvfb", type=int, default=0, help="start this many Xvfb displays and use those")
+    parser.add_argument("--targets", action="store_true",
+                        help="open a text widget on each display to type into (for testing with --xvfb)")
+    parser.add_argument("--verify", action="store_true",
+                        help="with --targets, check each display received exactly its jobs' words")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="worker count when no displays are given (with a headless backend)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pyautogui")
+    parser.add_argument("--no-paste", action="store_true", help="never use the clipboard")
+    for name, default in DEFAULT_SETTINGS.items():
+        if isinstance(default, bool):
+            parser.add_argument(f"--{name}", action="store_true")
+        else:
+            parser.add_argument(f"--{name}", type=float, default=default)
+    parser.add_argument("--start-delay", type=float, default=3, help="seconds each worker waits per job")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiply every wait by this (0 = no waits, for benchmarking)")
+    parser.add_argument("--stats-out", help="write the aggregated stats here as JSON")
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.target:
+        target_main(args.target)
+        return 0
+    if not args.files:
+        parser.error("no files given")
+    for path in args.files:
+        if not os.path.isfile(path):
+            print(f"Error: {path} is not a file", file=sys.stderr)
+            return 2
+    if args.verify and not args.targets:
+        parser.error("--verify needs --targets")
+
+    settings = {name: getattr(args, name) for name in DEFAULT_SETTINGS}
+    jobs = [Job(uuid.uuid4().hex[:12], os.path.abspath(path), settings, None) for path in args.files]
+
+    servers = []
+    targets = []
+    outputs = {}
+    try:
+        if args.xvfb:
+            try:
+                servers = start_xvfb(args.xvfb)
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+            displays = [display for display, _ in servers]
+        elif args.displays:
+            displays = args.displays
+        elif args.backend == "pyautogui":
+            parser.error("pyautogui needs --displays or --xvfb")
+        else:
+            displays = [None] * args.workers
+        if args.targets and None in displays:
+            parser.error("--targets needs --displays or --xvfb")
+        if args.targets:
+            target_dir = os.path.join(os.path.expanduser("~"), ".autotyper", "targets")
+            os.makedirs(target_dir, exist_ok=True)
+            for display in displays:
+                outputs[display] = os.path.join(target_dir, f"display{display.replace(':', '_')}.txt")
+                targets.append((display, launch_target(display, outputs[display])))
+
+        runner = BatchRunner(displays, args.backend, not args.no_paste, args.start_delay, args.time_scale)
+        print(f"Running {len(jobs)} job(s) on {len(displays)} worker(s)")
+
+        def on_result(result):
+            if "error" in result:
+                return
+            state = "done" if result["finished"] else "stopped"
+            print(f"  {result['worker']}: {os.path.basename(result['path'])} {state}, "
+                  f"{result['report']['chars']} chars in {result['report']['elapsed_seconds']:.1f}s")
+
+        summary = runner.run(jobs, on_result)
+        if args.verify:
+            # Let each target save its last keystrokes
+            time.sleep(TARGET_SAVE_MS * 2 / 1000)
+            summary["verified"] = verify(summary, outputs)
+    finally:
+        stop_processes(targets)
+        stop_processes(servers)
+
+    print(f"Jobs: {summary['jobs']} ({summary['finished']} finished), words: {summary['words']}, "
+          f"chars: {summary['chars']}")
+    print(f"Wall time: {summary['wall_seconds']:.2f}s, aggregate {summary['achieved_cps']:.0f} chars/s")
+    for error in summary["errors"]:
+        print(f"Worker {error['worker']} failed: {error['error']}", file=sys.stderr)
+    if "verified" in summary:
+        for display, ok in summary["verified"].items():
+            print(f"Verify {display}: {'ok' if ok else 'MISMATCH'}")
+    if args.stats_out:
+        with open(args.stats_out, 'w', encoding='utf-8') as file:
+            file.write(to_json(summary))
+    if runner.stopped:
+        return 130
+    if summary["errors"] or not all(summary.get("verified", {}).values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
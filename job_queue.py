@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import uuid
+from itertools import islice
+
+from typing_engine import iter_words
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".autotyper")
+
+# Write a checkpoint after this many words or seconds, whichever comes first
+CHECKPOINT_WORDS = 50
+CHECKPOINT_SECONDS = 5.0
+# Rewrite the checkpoint log with only the latest offsets once it grows past this size
+COMPACT_BYTES = 1 << 20
+
+DEFAULT_SETTINGS = {
+    "delay": 0.3,
+    "delete": 0.15,
+    "typo": 0.03,
+    "pause": 0.1,
+    "throughput": False,
+    "cps": 0,
+}
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Job:
+    def __init__(self, job_id, path, settings, fingerprint, offset=0):
+        self.id = job_id
+        self.path = path
+        self.settings = dict(DEFAULT_SETTINGS, **settings)
+        self.fingerprint = fingerprint
+        # Number of source words already typed
+        self.offset = offset
+
+    def to_record(self):
+        return {"id": self.id, "path": self.path, "settings": self.settings, "fingerprint": self.fingerprint}
+
+
+class CheckpointLog:
+    # Append-only log of "<job id> <offset>" lines; the last line for a job wins
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        offsets = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    parts = line.split()
+                    # A crash can leave a torn last line behind; skip it
+                    if len(parts) == 2 and parts[1].isdigit():
+                        offsets[parts[0]] = int(parts[1])
+            if os.path.getsize(self.path) > COMPACT_BYTES:
+                self.compact(offsets)
+        return offsets
+
+    def append(self, job_id, offset):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(f"{job_id} {offset}\n")
+
+    def compact(self, offsets):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for job_id, offset in offsets.items():
+                file.write(f"{job_id} {offset}\n")
+        os.replace(temp_path, self.path)
+
+
+class Checkpointer:
+    # Engine progress hook that writes the job's offset every few words or seconds
+    def __init__(self, log, job, every_words=CHECKPOINT_WORDS, every_seconds=CHECKPOINT_SECONDS):
+        self.log = log
+        self.job = job
+        self.every_words = every_words
+        self.every_seconds = every_seconds
+        self.saved_words = 0
+        self.saved_at = time.monotonic()
+
+    def __call__(self, engine):
+        words = engine.stats.words
+        if words - self.saved_words >= self.every_words or time.monotonic() - self.saved_at >= self.every_seconds:
+            self.save(engine)
+
+    def save(self, engine):
+        done = engine.words_done()
+        self.log.append(self.job.id, self.job.offset + done)
+        self.saved_words = engine.stats.words
+        self.saved_at = time.monotonic()
+        return self.job.offset + done
+
+
+class JobQueue:
+    # Jobs live in an append-only jobs.jsonl ("add"/"done" events) next to the checkpoint log
+    def __init__(self, state_dir=DEFAULT_STATE_DIR):
+        self.state_dir = state_dir
+        os.makedirs(os.path.join(state_dir, "texts"), exist_ok=True)
+        self.jobs_path = os.path.join(state_dir, "jobs.jsonl")
+        self.checkpoints = CheckpointLog(os.path.join(state_dir, "checkpoints.log"))
+
+    def append_event(self, event):
+        with open(self.jobs_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(event) + "\n")
+
+    def add_file(self, path, **settings):
+        path = os.path.abspath(path)
+        job = Job(uuid.uuid4().hex[:12], path, settings, file_fingerprint(path))
+        self.append_event(dict(job.to_record(), event="add"))
+        return job
+
+    def add_text(self, text, **settings):
+        # Editor text has no file of its own, so keep a copy in the state directory
+        path = os.path.join(self.state_dir, "texts", f"{uuid.uuid4().hex[:12]}.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return self.add_file(path, **settings)
+
+    def pending(self):
+        jobs = {}
+        if os.path.exists(self.jobs_path):
+            with open(self.jobs_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if event.get("event") == "add":
+                        jobs[event["id"]] = Job(event["id"], event["path"], event["settings"], event["fingerprint"])
+                    elif event.get("event") == "done":
+                        jobs.pop(event["id"], None)
+        offsets = self.checkpoints.load()
+        for job in jobs.values():
+            job.offset = offsets.get(job.id, 0)
+        return list(jobs.values())
+
+    def mark_done(self, job):
+        self.append_event({"event": "done", "id": job.id})
+        # Copies made by add_text belong to the queue, so they go with the job
+        texts = os.path.join(self.state_dir, "texts")
+        if os.path.dirname(os.path.abspath(job.path)) == os.path.abspath(texts):
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+    def run(self, engine, start_delay=3, on_job=None):
+        # Runs every pending job back to back on `engine`, resuming each from its last
+        # checkpoint. Returns True if the queue was emptied, False if it was stopped.
+        for job in self.pending():
+            if not os.path.exists(job.path):
+                self.mark_done(job)
+                continue
+            if file_fingerprint(job.path) != job.fingerprint:
+                # The text changed since it was queued, so old offsets no longer line up.
+                # Re-adding under the same id records the new fingerprint for next time.
+                job.offset = 0
+                job.fingerprint = file_fingerprint(job.path)
+                self.append_event(dict(job.to_record(), event="add"))
+                self.checkpoints.append(job.id, 0)
+            if on_job is not None:
+                on_job(job)
+
+            checkpointer = Checkpointer(self.checkpoints, job)
+            engine.begin_session()
+            # Keep any hook the caller installed (e.g. the progress window) running too
+            previous = engine.on_progress
+            if previous is None:
+                engine.on_progress = checkpointer
+            else:
+                engine.on_progress = lambda engine: (checkpointer(engine), previous(engine))
+            words = islice(iter_words(job.path), job.offset, None)
+            settings = job.settings
+            try:
+                if settings["throughput"]:
+                    finished = engine.run_throughput(words, settings["cps"], start_delay)
+                else:
+                    finished = engine.stream_words(words, settings["delay"], settings["delete"],
+                                                   settings["typo"], settings["pause"], start_delay)
+                if not finished:
+                    # The checkpoint resumes after the last whole word, so a typo left
+                    # waiting for its correction has to come off the screen now
+                    engine.discard_typo()
+            finally:
+                engine.on_progress = previous
+                job.offset = checkpointer.save(engine)
+
+            if not finished:
+                return False
+            self.mark_done(job)
+            start_delay = 0
+        return True
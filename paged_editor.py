@@ -0,0 +1,402 @@
+import os
+import mmap
+import shutil
+import threading
+from collections import deque
+import tkinter as tk
+from tkinter import scrolledtext
+
+PAGE_BYTES = 64 * 1024
+WINDOW_PAGES = 3
+# Load the neighbouring page once the view gets this close to either edge of the window
+EDGE_FRACTION = 0.1
+# Saves are written in chunks of this size, with a progress report after each
+SAVE_CHUNK_BYTES = 1 << 20
+# How often the Tk thread checks on a background open or save
+IO_POLL_MS = 100
+
+ORIGINAL = 0
+ADDED = 1
+
+
+class PieceTable:
+    # Byte-level piece table: the original file stays mapped read-only and every
+    # edit is appended to `added`; `pieces` lists (source, start, length) in order.
+    def __init__(self, original=b''):
+        self.original = original
+        self.added = bytearray()
+        self.pieces = [(ORIGINAL, 0, len(original))] if len(original) else []
+        self.length = len(original)
+
+    def __len__(self):
+        return self.length
+
+    def buffer(self, source):
+        return self.original if source == ORIGINAL else self.added
+
+    def iter_range(self, start, end):
+        # Yields the byte slices covering [start, end) without joining them
+        offset = 0
+        for source, piece_start, length in self.pieces:
+            piece_end = offset + length
+            if piece_end > start and offset < end:
+                lo = max(start, offset) - offset + piece_start
+                hi = min(end, piece_end) - offset + piece_start
+                yield self.buffer(source)[lo:hi]
+            if piece_end >= end:
+                break
+            offset = piece_end
+
+    def read(self, start, end):
+        return b''.join(self.iter_range(start, min(end, self.length)))
+
+    def replace(self, start, end, data):
+        # Replaces bytes [start, end) with `data`, splitting the pieces at both ends
+        pieces = []
+        offset = 0
+        inserted = False
+        for source, piece_start, length in self.pieces:
+            piece_end = offset + length
+            if offset < start:
+                pieces.append((source, piece_start, min(length, start - offset)))
+            if not inserted and piece_end >= start:
+                if data:
+                    pieces.append((ADDED, len(self.added), len(data)))
+                    self.added += data
+                inserted = True
+            if piece_end > end:
+                skip = max(0, end - offset)
+                pieces.append((source, piece_start + skip, length - skip))
+            offset = piece_end
+        if not inserted and data:
+            pieces.append((ADDED, len(self.added), len(data)))
+            self.added += data
+        self.pieces = [piece for piece in pieces if piece[2]]
+        self.length += len(data) - (end - start)
+
+    def iter_chunks(self, chunk_size=SAVE_CHUNK_BYTES, pieces=None):
+        # Bounded slices, so saving never copies a whole file-sized piece at once. Edits only
+        # ever append to `added`, so a saved copy of `pieces` stays readable while editing goes on.
+        for source, piece_start, length in self.pieces if pieces is None else pieces:
+            buffer = self.buffer(source)
+            for start in range(piece_start, piece_start + length, chunk_size):
+                yield buffer[start:min(start + chunk_size, piece_start + length)]
+
+
+class PagedDocument:
+    # A document backed by a memory-mapped file plus a piece table of edits
+    def __init__(self, path=None):
+        self.path = path
+        self.file = None
+        self.map = None
+        self.table = PieceTable(self.open_map())
+        # Keep the file's line endings when edited pages are written back
+        self.newline = '\r\n' if b'\r\n' in self.table.read(0, PAGE_BYTES) else '\n'
+
+    def __len__(self):
+        return len(self.table)
+
+    def open_map(self):
+        # Maps the document's file read-only and returns it (b'' for no file or an empty one)
+        if not self.path or not os.path.getsize(self.path):
+            return b''
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+            self.map = self.file = None
+
+    def decode(self, data):
+        text = data.decode('utf-8', errors='replace')
+        return text.replace('\r\n', '\n') if self.newline == '\r\n' else text
+
+    def encode(self, text):
+        if self.newline == '\r\n':
+            text = text.replace('\n', '\r\n')
+        return text.encode('utf-8')
+
+    def boundary(self, offset):
+        # First page boundary at or after `offset`: just past a newline, or failing
+        # that the next UTF-8 character start so a page never splits a character
+        offset = max(0, min(offset, len(self)))
+        if offset == 0 or offset == len(self):
+            return offset
+        data = self.table.read(offset - 1, offset - 1 + PAGE_BYTES)
+        newline = data.find(b'\n')
+        if newline != -1:
+            return offset + newline
+        for i in range(1, len(data)):
+            if data[i] & 0xC0 != 0x80:
+                return offset - 1 + i
+        return len(self)
+
+    def read_text(self, start, end):
+        return self.decode(self.table.read(start, end))
+
+    def replace_text(self, start, end, text):
+        data = self.encode(text)
+        self.table.replace(start, end, data)
+        return len(data)
+
+    def text(self):
+        return self.read_text(0, len(self))
+
+    def data(self):
+        return b''.join(self.table.iter_chunks())
+
+    def write_temp(self, path, on_progress=None):
+        # Streams the pieces into a temporary file next to `path` and returns its name.
+        # Safe to run off the Tk thread; on_progress(written, total) follows every chunk.
+        temp_path = path + '.tmp'
+        pieces = list(self.table.pieces)
+        total = sum(length for _, _, length in pieces)
+        written = 0
+        try:
+            with open(temp_path, 'wb') as file:
+                for chunk in self.table.iter_chunks(pieces=pieces):
+                    file.write(chunk)
+                    written += len(chunk)
+                    if on_progress:
+                        on_progress(written, total)
+                # On disk before the rename, so a crash leaves the old file or the new one
+                file.flush()
+                os.fsync(file.fileno())
+            # The rename would otherwise give the file umask default permissions
+            if os.path.exists(path):
+                shutil.copymode(path, temp_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return temp_path
+
+    def maps(self, path):
+        return self.map is not None and os.path.exists(path) and os.path.samefile(path, self.path)
+
+    def replace_file(self, temp_path, path):
+        # Windows can't replace a file that is mapped, so the mapping is only let go when the
+        # target is our own original, and is restored if the rename fails anyway
+        mapped = self.maps(path)
+        if mapped:
+            self.close()
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            if mapped:
+                self.table.original = self.open_map()
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def save(self, path):
+        self.replace_file(self.write_temp(path), path)
+
+
+class PagedEditor:
+    # ScrolledText front end that only holds a few pages of a PagedDocument at a time
+    def __init__(self, parent, **options):
+        self.text = scrolledtext.ScrolledText(parent, undo=False, **options)
+        self.text.configure(yscrollcommand=self.on_yscroll)
+        self.text.vbar.configure(command=self.on_scrollbar)
+        self.document = PagedDocument()
+        self.window_start = 0
+        self.window_end = 0
+        self.shifting = False
+        # Edits folded into the document since it was loaded or saved
+        self.dirty = False
+        self.io_thread = None
+
+    def pack(self, **options):
+        self.text.pack(**options)
+
+    def load_file(self, path):
+        self.set_document(PagedDocument(path))
+
+    def set_document(self, document):
+        self.document.close()
+        self.document = document
+        self.dirty = False
+        self.show_window(0)
+
+    def clear(self):
+        self.set_document(PagedDocument())
+
+    def show_window(self, start):
+        doc = self.document
+        self.window_start = start
+        self.window_end = doc.boundary(start + WINDOW_PAGES * PAGE_BYTES)
+        # Paging goes on while the editor is read-only for a background save
+        state = self.text.cget("state")
+        self.text.configure(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", doc.read_text(self.window_start, self.window_end))
+        self.text.configure(state=state)
+        self.text.edit_modified(False)
+
+    def sync(self):
+        # Folds edits made in the visible window back into the piece table
+        if not self.text.edit_modified():
+            return
+        text = self.text.get("1.0", "end-1c")
+        length = self.document.replace_text(self.window_start, self.window_end, text)
+        self.window_end = self.window_start + length
+        self.dirty = True
+        self.text.edit_modified(False)
+
+    def offset_of(self, index):
+        return self.window_start + len(self.document.encode(self.text.get("1.0", index)))
+
+    def index_of(self, offset):
+        chars = len(self.document.read_text(self.window_start, offset))
+        return f"1.0 + {chars} chars"
+
+    def move_window(self, start, anchor):
+        # Reloads the window at `start` and keeps document offset `anchor` at the top
+        self.sync()
+        self.show_window(start)
+        self.text.yview(self.index_of(anchor))
+
+    def on_yscroll(self, first, last):
+        first, last = float(first), float(last)
+        size = len(self.document)
+        window = max(1, self.window_end - self.window_start)
+        if size:
+            self.text.vbar.set((self.window_start + first * window) / size,
+                               (self.window_start + last * window) / size)
+        else:
+            self.text.vbar.set(first, last)
+        if self.shifting:
+            return
+        if last > 1 - EDGE_FRACTION and self.window_end < size:
+            self.shifting = True
+            self.text.after_idle(self.shift, 1)
+        elif first < EDGE_FRACTION and self.window_start > 0:
+            self.shifting = True
+            self.text.after_idle(self.shift, -1)
+
+    def shift(self, direction):
+        try:
+            self.sync()
+            anchor = self.offset_of("@0,0")
+            step = PAGE_BYTES if direction > 0 else -PAGE_BYTES
+            start = self.document.boundary(self.window_start + step)
+            if start != self.window_start:
+                self.move_window(start, anchor)
+        finally:
+            self.shifting = False
+
+    def on_scrollbar(self, *args):
+        if args[0] != 'moveto':
+            self.text.yview(*args)
+            return
+        self.sync()
+        target = int(float(args[1]) * len(self.document))
+        if self.window_start <= target < self.window_end or not len(self.document):
+            window = self.window_end - self.window_start
+            self.text.yview_moveto((target - self.window_start) / max(1, window))
+            return
+        self.shifting = True
+        try:
+            anchor = self.document.boundary(target)
+            self.move_window(self.document.boundary(target - PAGE_BYTES), anchor)
+        finally:
+            self.shifting = False
+
+    def get_text(self):
+        self.sync()
+        return self.document.text()
+
+    def get_bytes(self):
+        # Raw UTF-8 bytes (file line endings kept); cheaper than get_text when only words are needed
+        self.sync()
+        return self.document.data()
+
+    def is_dirty(self):
+        return self.dirty or self.text.edit_modified()
+
+    def holds(self, path):
+        # True if the editor's document was loaded from (or last saved to) `path`
+        doc_path = self.document.path
+        return bool(doc_path) and os.path.exists(path) and os.path.exists(doc_path) and os.path.samefile(path, doc_path)
+
+    def needs_save(self, path):
+        # Saving an unchanged document back over its own file would only rewrite the same bytes
+        return self.is_dirty() or not self.holds(path)
+
+    def busy(self):
+        return self.io_thread is not None
+
+    def save(self, path):
+        self.sync()
+        self.replace_document(self.document.write_temp(path), path)
+
+    def replace_document(self, temp_path, path):
+        anchor = self.offset_of("@0,0")
+        self.document.replace_file(temp_path, path)
+        # The saved file becomes the new original, so the edit history starts over
+        previous = self.document
+        self.document = PagedDocument(path)
+        previous.close()
+        self.dirty = False
+        self.move_window(self.document.boundary(self.window_start), anchor)
+
+    def save_async(self, path, on_progress=None, on_done=None):
+        # Writes the temp file on a worker and renames it into place on the Tk thread.
+        # Returns False without saving if nothing changed since `path` was loaded or saved.
+        if not self.needs_save(path):
+            return False
+        self.sync()
+        document = self.document
+        # Edits typed during the write would not be in the saved copy, so hold them off
+        self.text.configure(state="disabled")
+        self.run_io(lambda report: document.write_temp(path, report),
+                    lambda temp_path: self.replace_document(temp_path, path),
+                    on_progress, on_done)
+        return True
+
+    def load_file_async(self, path, on_done=None):
+        self.text.configure(state="disabled")
+        self.run_io(lambda report: PagedDocument(path), self.set_document, None, on_done)
+
+    def run_io(self, work, finish, on_progress, on_done):
+        # work(report) runs on a worker thread and only hands results back through a
+        # one-slot deque and a list, which the Tk thread polls; Tk is never called off its thread
+        if self.io_thread is not None:
+            raise RuntimeError("A file is already being opened or saved")
+        progress = deque(maxlen=1)
+        outcome = []
+
+        def run():
+            try:
+                outcome.append((work(lambda done, total: progress.append((done, total))), None))
+            except Exception as e:
+                outcome.append((None, e))
+
+        self.io_thread = threading.Thread(target=run, name="editor-io", daemon=True)
+        self.io_thread.start()
+        self.text.after(IO_POLL_MS, self.poll_io, progress, outcome, finish, on_progress, on_done)
+
+    def poll_io(self, progress, outcome, finish, on_progress, on_done):
+        if progress and on_progress:
+            on_progress(*progress.pop())
+        if not outcome:
+            self.text.after(IO_POLL_MS, self.poll_io, progress, outcome, finish, on_progress, on_done)
+            return
+        self.io_thread = None
+        result, error = outcome[0]
+        self.text.configure(state="normal")
+        if error is None:
+            try:
+                finish(result)
+            except Exception as e:
+                error = e
+        if on_done:
+            on_done(error)
@@ -0,0 +1,133 @@
+import os
+import hashlib
+import numpy as np
+
+from typing_engine import TypingPlan, compile_plan
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".autotyper", "cache")
+DEFAULT_CACHE_BYTES = 256 << 20
+# Bump when the tokenizer or plan layout changes so stale entries are never reused
+CACHE_VERSION = 1
+
+# Same whitespace as iter_words (ASCII only), so cached and streamed runs split alike
+SPACE_TABLE = np.zeros(256, dtype=bool)
+SPACE_TABLE[list(b' \t\n\r\x0b\x0c')] = True
+
+
+def tokenize(data):
+    # Returns an (n, 2) uint64 array of [start, end) byte offsets of the words in `data`
+    space = SPACE_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    # Pad with whitespace on both sides; every change between space and non-space is a word edge
+    edges = np.flatnonzero(np.diff(np.concatenate(([True], space, [True])).view(np.int8)))
+    return edges.astype(np.uint64).reshape(-1, 2)
+
+
+class WordList:
+    # Read-only sequence of words decoded on demand from `data` at `offsets`, so a cached
+    # document never has to be split into Python strings up front
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return WordList(self.data, self.offsets[index])
+        start, end = self.offsets[index]
+        return bytes(self.data[start:end]).decode('utf-8', errors='replace')
+
+    def __iter__(self):
+        for block in range(0, len(self.offsets), 4096):
+            for start, end in self.offsets[block:block + 4096].tolist():
+                yield bytes(self.data[start:end]).decode('utf-8', errors='replace')
+
+    def typed_length(self):
+        # Bytes plus one space per word: the character count for ASCII text, close enough
+        # for a duration estimate otherwise
+        return int((self.offsets[:, 1] - self.offsets[:, 0]).sum()) + len(self.offsets)
+
+
+class PlanCache:
+    # On-disk cache of word offsets (keyed by content hash) and compiled plans (keyed by
+    # content hash, settings and seed), stored as .npy files that load memory-mapped.
+    # File mtimes double as LRU timestamps; the oldest entries go once the cache is too big.
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def content_key(self, data):
+        return hashlib.blake2b(data, digest_size=16, person=b'autotyper%d' % CACHE_VERSION).hexdigest()
+
+    def plan_key(self, content_key, delay, delete_chance, typo_chance, pause_chance, seed):
+        settings = f"{content_key}:{delay!r}:{delete_chance!r}:{typo_chance!r}:{pause_chance!r}:{seed}"
+        return hashlib.blake2b(settings.encode(), digest_size=16).hexdigest()
+
+    def path(self, name):
+        return os.path.join(self.directory, name + ".npy")
+
+    def load(self, name):
+        path = self.path(name)
+        try:
+            array = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        # Touch on every hit so eviction goes by last use, not by creation
+        os.utime(path)
+        return array
+
+    def store(self, name, array):
+        path = self.path(name)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            np.save(file, array)
+        os.replace(temp_path, path)
+        self.evict()
+        return array
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def words(self, data):
+        # Returns (content key, WordList); `data` is bytes or a memory map of the text
+        key = self.content_key(data)
+        offsets = self.load(key + "-words")
+        if offsets is None:
+            offsets = self.store(key + "-words", tokenize(data))
+        return key, WordList(data, offsets)
+
+    def plan(self, data, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1, seed=None):
+        key, words = self.words(data)
+        if seed is None:
+            # An unseeded run is meant to differ every time, so only the tokens are reused
+            return compile_plan(words, delay, delete_chance, typo_chance, pause_chance)
+        name = self.plan_key(key, delay, delete_chance, typo_chance, pause_chance, seed) + "-plan"
+        actions = self.load(name)
+        if actions is None:
+            actions = self.store(name, compile_plan(words, delay, delete_chance, typo_chance, pause_chance,
+                                                    seed).actions)
+        return TypingPlan(words, actions, delay)
+
+
+def map_file(path):
+    # Read-only memory map of a file (or b'' for an empty one) to pass to PlanCache
+    import mmap
+    if not os.path.getsize(path):
+        return b''
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import cProfile
+import threading
+from collections import Counter
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".autotyper", "profiles")
+# Stack sampling period; 5 ms is fine-grained enough for per-word emits without hogging the GIL
+SAMPLE_INTERVAL = 0.005
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SessionProfiler:
+    # Profiles one typing session. cProfile traces the thread that enters the `with` block
+    # (the typing thread), and a sampler thread records the stacks of every other thread
+    # too, so time lost to the Tk loop or the keyboard hook shows up in the flamegraph.
+    # On exit it writes <name>.collapsed (flamegraph.pl / speedscope) and <name>.pstats.
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, interval=SAMPLE_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.paths = None
+
+    def __enter__(self):
+        self.profile = cProfile.Profile()
+        self.done = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, name="profiler", daemon=True)
+        self.sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.done.set()
+        self.sampler.join()
+        self.save()
+        return False
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.done.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(self.directory, time.strftime("autotyper-%Y%m%d-%H%M%S"))
+        collapsed_path = prefix + ".collapsed"
+        pstats_path = prefix + ".pstats"
+        with open(collapsed_path, 'w', encoding='utf-8') as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{stack} {count}\n")
+        self.profile.dump_stats(pstats_path)
+        self.paths = (collapsed_path, pstats_path)
+        return self.paths
+
+
+def profiled(job, profiler):
+    # Wraps a job(engine) callable so it runs under `profiler` on whatever thread calls it
+    def run(engine):
+        with profiler:
+            return job(engine)
+    return run
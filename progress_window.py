@@ -0,0 +1,96 @@
+import time
+from collections import deque
+import tkinter as tk
+from tkinter import ttk
+
+from typing_engine import format_duration
+
+# How often the UI drains the feed; one redraw per tick no matter how fast the typing is
+REFRESH_MS = 250
+# Current WPM is measured over this trailing window
+WPM_WINDOW_SECONDS = 5.0
+
+
+class ProgressFeed:
+    # Hand-off from the typing thread to the UI. Only the newest snapshot matters, so a
+    # one-slot deque coalesces updates for free; append/pop are atomic, so no lock is needed.
+    def __init__(self):
+        self.latest = deque(maxlen=1)
+
+    def push(self, engine):
+        # Used as TypingEngine.on_progress, so it runs on the typing thread after every word
+        self.latest.append((engine.words_done(), engine.stats.chars, time.perf_counter()))
+
+    def take(self):
+        try:
+            return self.latest.pop()
+        except IndexError:
+            return None
+
+
+class ProgressWindow:
+    # Small always-on-top window showing percent done, ETA and current WPM
+    def __init__(self, root, feed, total_words=None):
+        self.root = root
+        self.feed = feed
+        self.total_words = total_words
+        self.samples = deque()
+        self.first = None
+        self.job = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Auto Typer - Typing")
+        self.window.resizable(False, False)
+        self.window.attributes('-topmost', True)
+        self.window.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        frame = ttk.Frame(self.window, padding=12)
+        frame.pack(fill="both", expand=True)
+        self.bar = ttk.Progressbar(frame, length=260, maximum=100,
+                                   mode="determinate" if total_words else "indeterminate")
+        self.bar.pack(fill="x")
+        self.status = ttk.Label(frame, text="Starting...")
+        self.status.pack(anchor="w", pady=(8, 0))
+        self.detail = ttk.Label(frame, text="Press ESC to stop", foreground="#5F6368")
+        self.detail.pack(anchor="w")
+
+        self.job = self.root.after(REFRESH_MS, self.refresh)
+
+    def refresh(self):
+        snapshot = self.feed.take()
+        if snapshot is not None:
+            self.show(*snapshot)
+        self.job = self.root.after(REFRESH_MS, self.refresh)
+
+    def show(self, words, chars, at):
+        samples = self.samples
+        samples.append((at, words))
+        while at - samples[0][0] > WPM_WINDOW_SECONDS:
+            samples.popleft()
+        first_at, first_words = samples[0]
+        wpm = (words - first_words) * 60 / (at - first_at) if at > first_at else 0.0
+
+        if self.first is None:
+            self.first = (at, words)
+
+        if self.total_words:
+            fraction = min(1.0, words / self.total_words)
+            self.bar['value'] = fraction * 100
+            # Rate since the first word for the ETA: it averages over pauses and rewinds,
+            # which the short WPM window does not
+            first_at, first_words = self.first
+            done = words - first_words
+            eta = (at - first_at) * (self.total_words - words) / done if done > 0 else None
+            self.status.config(text=f"{fraction * 100:.0f}% - {words} of {self.total_words} words")
+            eta_text = format_duration(eta) if eta is not None else "estimating"
+            self.detail.config(text=f"ETA {eta_text} - {wpm:.0f} WPM - ESC to stop")
+        else:
+            self.bar.step(5)
+            self.status.config(text=f"{words} words, {chars} characters")
+            self.detail.config(text=f"{wpm:.0f} WPM - ESC to stop")
+
+    def close(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.window.destroy()
@@ -0,0 +1,168 @@
+import json
+from bisect import bisect_left
+
+# Upper bounds (seconds) shared by the latency histograms, Prometheus style
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "autotyper_"
+
+
+class Histogram:
+    # Fixed-bucket histogram: observe() is a bisect and two adds, memory is constant
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (None past the last bound)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], self.counts)),
+        }
+
+
+class SessionStats:
+    # Counters and histograms for one typing session, filled in by TypingEngine
+    COUNTERS = (
+        ("words", "Words typed, not counting retypes"),
+        ("chars", "Characters emitted, typos and retypes included"),
+        ("typos", "Typos injected"),
+        ("rewinds", "Delete-and-retype rewinds injected"),
+        ("retyped_words", "Words retyped after a rewind"),
+        ("backspaces", "Word deletions sent"),
+        ("emits", "Calls made to the output backend"),
+    )
+
+    def __init__(self, requested_wpm=None, requested_cps=None):
+        for name, _ in self.COUNTERS:
+            setattr(self, name, 0)
+        self.requested_wpm = requested_wpm
+        self.requested_cps = requested_cps
+        self.emit_seconds = 0.0
+        self.emit_time = Histogram()
+        self.keystroke_interval = Histogram()
+        self.last_emit = None
+
+    def record_emit(self, started, finished, chars=0):
+        self.emits += 1
+        self.chars += chars
+        self.emit_seconds += finished - started
+        self.emit_time.observe(finished - started)
+        if self.last_emit is not None:
+            self.keystroke_interval.observe(started - self.last_emit)
+        self.last_emit = finished
+
+    def report(self, scheduler):
+        timing = scheduler.report()
+        elapsed = timing["elapsed_seconds"]
+        minutes = elapsed / 60
+        report = {name: getattr(self, name) for name, _ in self.COUNTERS}
+        report.update({
+            "elapsed_seconds": elapsed,
+            "emit_seconds": self.emit_seconds,
+            "sleep_seconds": timing["slept_seconds"],
+            # Whatever is neither emitting nor sleeping: planning, bookkeeping, GIL waits
+            "other_seconds": max(0.0, elapsed - self.emit_seconds - timing["slept_seconds"]),
+            "achieved_wpm": self.words / minutes if minutes else 0.0,
+            "requested_wpm": self.requested_wpm,
+            "achieved_cps": self.chars / elapsed if elapsed else 0.0,
+            "requested_cps": self.requested_cps,
+            "timing": timing,
+            "emit_time": self.emit_time.summary(),
+            "keystroke_interval": self.keystroke_interval.summary(),
+        })
+        return report
+
+
+def format_summary(report):
+    # Short human-readable version of SessionStats.report() for the completion dialog
+    if report["requested_cps"]:
+        speed = f"{report['achieved_cps']:.0f} chars/s (requested {report['requested_cps']:.0f})"
+    elif report["requested_wpm"]:
+        speed = f"{report['achieved_wpm']:.1f} WPM (requested {report['requested_wpm']:.0f})"
+    else:
+        speed = f"{report['achieved_wpm']:.1f} WPM, {report['achieved_cps']:.0f} chars/s"
+    interval = report["keystroke_interval"]
+    return (f"Words: {report['words']}, characters: {report['chars']}\n"
+            f"Typos: {report['typos']}, rewinds: {report['rewinds']}\n"
+            f"Speed: {speed}\n"
+            f"Time emitting: {report['emit_seconds']:.1f}s, sleeping: {report['sleep_seconds']:.1f}s, "
+            f"other: {report['other_seconds']:.1f}s\n"
+            f"Keystroke interval: mean {interval['mean'] * 1000:.0f} ms, "
+            f"p95 <= {format_bound(interval['p95'])}\n"
+            f"Timing jitter: {report['timing']['jitter_mean_ms']:.1f} ms "
+            f"(max {report['timing']['jitter_max_ms']:.1f} ms)")
+
+
+def format_bound(bound):
+    return "over 10 s" if bound is None else f"{bound * 1000:g} ms"
+
+
+def to_json(report):
+    return json.dumps(report, indent=2)
+
+
+def to_prometheus(report):
+    # Prometheus text exposition format
+    lines = []
+
+    def metric(name, kind, help_text, value):
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+        lines.append(f"{METRIC_PREFIX}{name} {value}")
+
+    for name, help_text in SessionStats.COUNTERS:
+        metric(f"{name}_total", "counter", help_text, report[name])
+    metric("elapsed_seconds", "gauge", "Session wall time", report["elapsed_seconds"])
+    metric("emit_seconds", "gauge", "Time spent inside the output backend", report["emit_seconds"])
+    metric("sleep_seconds", "gauge", "Time spent in scheduled waits", report["sleep_seconds"])
+    metric("achieved_wpm", "gauge", "Words per minute actually typed", report["achieved_wpm"])
+    metric("achieved_cps", "gauge", "Characters per second actually typed", report["achieved_cps"])
+    if report["requested_wpm"]:
+        metric("requested_wpm", "gauge", "Words per minute implied by the settings", report["requested_wpm"])
+    if report["requested_cps"]:
+        metric("requested_cps", "gauge", "Max throughput chars/sec target", report["requested_cps"])
+    metric("jitter_mean_seconds", "gauge", "Mean lateness of scheduled waits",
+           report["timing"]["jitter_mean_ms"] / 1000)
+
+    for name, help_text in (("emit_time_seconds", "Duration of each backend call"),
+                            ("keystroke_interval_seconds", "Time between consecutive backend calls")):
+        summary = report["emit_time" if name.startswith("emit") else "keystroke_interval"]
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+        cumulative = 0
+        for bound, count in summary["buckets"].items():
+            cumulative += count
+            lines.append(f'{METRIC_PREFIX}{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{METRIC_PREFIX}{name}_sum {summary['mean'] * summary['count']}")
+        lines.append(f"{METRIC_PREFIX}{name}_count {summary['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def export(report, path):
+    # Picks the format from the extension: .prom/.txt for Prometheus, JSON otherwise
+    text = to_prometheus(report) if path.endswith(('.prom', '.txt')) else to_json(report)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
@@ -0,0 +1,717 @@
+import re
+import sys
+import math
+from collections import deque
+import time
+import threading
+import numpy as np
+
+from session_stats import SessionStats
+
+
+class StopSignal:
+    # Cancellation token shared by the typing thread and the ESC keyboard hook.
+    # `event` may be a multiprocessing Event so another process can stop the session.
+    def __init__(self, event=None):
+        self.event = event if event is not None else threading.Event()
+        self.pressed_at = None
+        self.last_emit_at = None
+
+    def set(self):
+        if not self.event.is_set():
+            self.pressed_at = time.perf_counter()
+            self.event.set()
+
+    def is_set(self):
+        return self.event.is_set()
+
+    def wait(self, timeout):
+        # Sleep for up to `timeout` seconds, returning True as soon as stop is requested
+        return self.event.wait(timeout)
+
+    def mark_emit(self, at=None):
+        self.last_emit_at = time.perf_counter() if at is None else at
+
+    def stop_latency(self):
+        # Time from the stop keypress to the last emitted keystroke (0 if nothing followed it)
+        if self.pressed_at is None:
+            return None
+        if self.last_emit_at is None or self.last_emit_at < self.pressed_at:
+            return 0.0
+        return self.last_emit_at - self.pressed_at
+
+
+# Output backends: everything the engine types goes through one of these
+
+class OutputBackend:
+    name = "base"
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        raise NotImplementedError
+
+    def repeat_hotkey(self, count, *keys):
+        for _ in range(count):
+            self.hotkey(*keys)
+
+    # Non-blocking variants for the asyncio engine: they send the keys and return the
+    # pauses (in seconds, in order) that write/hotkey would have slept through instead
+
+    def write_steps(self, text):
+        self.write(text)
+        return ()
+
+    def hotkey_steps(self, *keys):
+        self.hotkey(*keys)
+        return ()
+
+
+class PyAutoGUIBackend(OutputBackend):
+    name = "pyautogui"
+
+    def __init__(self, pause=True):
+        # Imported here so headless runs never need a display
+        import pyautogui
+        self.pyautogui = pyautogui
+        # pause=False skips pyautogui.PAUSE after every call (the failsafe stays on)
+        self.pause = pause
+
+    def write(self, text):
+        self.pyautogui.write(text, _pause=self.pause)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys, _pause=self.pause)
+
+    def write_steps(self, text):
+        self.pyautogui.write(text, _pause=False)
+        return (self.pyautogui.PAUSE,) if self.pause else ()
+
+    def hotkey_steps(self, *keys):
+        self.pyautogui.hotkey(*keys, _pause=False)
+        return (self.pyautogui.PAUSE,) if self.pause else ()
+
+    def repeat_hotkey(self, count, *keys):
+        # One held modifier and a burst of presses instead of `count` full hotkey calls
+        modifiers, key = keys[:-1], keys[-1]
+        for modifier in modifiers:
+            self.pyautogui.keyDown(modifier, _pause=False)
+        try:
+            self.pyautogui.press(key, presses=count, _pause=False)
+        finally:
+            for modifier in reversed(modifiers):
+                self.pyautogui.keyUp(modifier, _pause=False)
+
+
+class RecordingBackend(OutputBackend):
+    # Keeps every emit in memory as (timestamp, kind, payload) for tests and profiling
+    name = "recording"
+
+    def __init__(self, clipboard=None):
+        self.events = []
+        # With a clipboard, a paste hotkey is recorded as ("paste", text on the clipboard)
+        self.clipboard = clipboard
+
+    def write(self, text):
+        self.events.append((time.perf_counter(), "write", text))
+
+    def hotkey(self, *keys):
+        if self.clipboard is not None and keys == PASTE_KEYS:
+            self.events.append((time.perf_counter(), "paste", self.clipboard.get()))
+        else:
+            self.events.append((time.perf_counter(), "hotkey", keys))
+
+    def keystroke_count(self):
+        return sum(len(payload) if kind == "write" else 1 for _, kind, payload in self.events)
+
+    def clear(self):
+        self.events = []
+
+
+class NullBackend(OutputBackend):
+    name = "null"
+
+    def write(self, text):
+        pass
+
+    def hotkey(self, *keys):
+        pass
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "recording": RecordingBackend,
+    "null": NullBackend,
+}
+
+
+# Clipboard paste: for text the keyboard can't type, and optionally for long runs
+
+# pyautogui only presses keys it has a mapping for and silently drops everything else
+UNTYPEABLE_PATTERN = re.compile(r'[^\x20-\x7e\n\t]+')
+# A typeable run this short next to a pasted run joins the paste (e.g. the rest of "café")
+PASTE_MERGE_CHARS = 8
+# With bulk pasting on, typeable runs at least this long are pasted too
+PASTE_BULK_CHARS = 64
+# Some applications truncate very large pastes, so long segments go in several pastes
+PASTE_CHUNK_CHARS = 4096
+# Time for the target application to read the clipboard before it changes again
+PASTE_SETTLE_SECONDS = 0.05
+PASTE_KEYS = ('command', 'v') if sys.platform == 'darwin' else ('ctrl', 'v')
+
+
+class LocalClipboard:
+    # In-memory stand-in for the system clipboard, for tests and headless runs
+    def __init__(self, text=''):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def set(self, text):
+        self.text = text
+
+
+class SystemClipboard:
+    def __init__(self):
+        # pyperclip comes with pyautogui; imported here so headless runs never need it.
+        # Only text is saved and restored, so an image on the clipboard is not kept.
+        import pyperclip
+        self.pyperclip = pyperclip
+
+    def get(self):
+        return self.pyperclip.paste()
+
+    def set(self, text):
+        self.pyperclip.copy(text)
+
+
+def system_clipboard():
+    # The system clipboard, or None if there is no usable one (e.g. Linux without xclip or
+    # xsel, where pyperclip only fails on first use, part way through a session)
+    try:
+        clipboard = SystemClipboard()
+        clipboard.get()
+    except Exception:
+        return None
+    return clipboard
+
+
+def split_segments(text, bulk_chars=None):
+    # Splits text into (paste, segment) pairs: untypeable runs are always pasted, and
+    # a typeable run is pasted when that is cheaper than typing it
+    segments = []
+    position = 0
+    for match in UNTYPEABLE_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append([False, text[position:match.start()]])
+        segments.append([True, match.group()])
+        position = match.end()
+    if position < len(text):
+        segments.append([False, text[position:]])
+
+    # Typeable and untypeable runs alternate, so a typeable run's neighbours are pastes
+    for i, segment in enumerate(segments):
+        if segment[0]:
+            continue
+        length = len(segment[1])
+        next_to_paste = len(segments) > 1
+        if (next_to_paste and length <= PASTE_MERGE_CHARS) or (bulk_chars and length >= bulk_chars):
+            segment[0] = True
+
+    merged = []
+    for paste, segment in segments:
+        if merged and merged[-1][0] == paste:
+            merged[-1] = (paste, merged[-1][1] + segment)
+        else:
+            merged.append((paste, segment))
+    return merged
+
+
+class PasteBackend(OutputBackend):
+    # Wraps a keyboard backend and sends what it can't type (and, with bulk_chars, long
+    # runs) as chunked clipboard pastes, putting the user's clipboard back afterwards
+    name = "paste"
+
+    def __init__(self, inner, clipboard=None, bulk_chars=None, chunk_chars=PASTE_CHUNK_CHARS,
+                 settle=PASTE_SETTLE_SECONDS):
+        self.inner = inner
+        self.clipboard = clipboard if clipboard is not None else SystemClipboard()
+        self.bulk_chars = bulk_chars
+        self.chunk_chars = chunk_chars
+        self.settle = settle
+        self.pastes = 0
+
+    def needs_paste(self, text):
+        return bool(UNTYPEABLE_PATTERN.search(text)) or bool(self.bulk_chars and len(text) >= self.bulk_chars)
+
+    def write(self, text):
+        if not self.needs_paste(text):
+            # Plain short text, the common case: no segmenting at all
+            self.inner.write(text)
+            return
+        for pause in self.paste_steps(text):
+            time.sleep(pause)
+
+    def write_steps(self, text):
+        if not self.needs_paste(text):
+            return self.inner.write_steps(text)
+        return self.paste_steps(text)
+
+    def paste_steps(self, text):
+        # Yields each pause (the inner backend's, then the settle time) at the point it is
+        # due, so the user's clipboard is only put back once the last paste has been read
+        original = None
+        try:
+            for paste, segment in split_segments(text, self.bulk_chars):
+                if not paste:
+                    yield from self.inner.write_steps(segment)
+                    continue
+                if original is None:
+                    original = self.clipboard.get()
+                for start in range(0, len(segment), self.chunk_chars):
+                    self.clipboard.set(segment[start:start + self.chunk_chars])
+                    yield from self.inner.hotkey_steps(*PASTE_KEYS)
+                    self.pastes += 1
+                    if self.settle:
+                        yield self.settle
+        finally:
+            if original is not None:
+                self.clipboard.set(original)
+
+    def hotkey(self, *keys):
+        self.inner.hotkey(*keys)
+
+    def hotkey_steps(self, *keys):
+        return self.inner.hotkey_steps(*keys)
+
+    def repeat_hotkey(self, count, *keys):
+        self.inner.repeat_hotkey(count, *keys)
+
+
+def configure_backend(backend, throughput):
+    # Max throughput mode skips pyautogui's per-call pause and pastes whole batches
+    if isinstance(backend, PasteBackend):
+        backend.bulk_chars = PASTE_BULK_CHARS if throughput else None
+        backend = backend.inner
+    if isinstance(backend, PyAutoGUIBackend):
+        backend.pause = not throughput
+
+
+# Typing plan: every random decision is rolled up front into one action array
+
+OP_WRITE = 0    # type words[word] followed by a space
+OP_TYPO = 1     # type words[word] with its last letter replaced by TYPO_LETTERS[aux]
+OP_DELETE = 2   # ctrl+backspace once (corrects the typo just made)
+OP_REWIND = 3   # ctrl+backspace `aux` times
+OP_RETYPE = 4   # retype the next word removed by the last OP_REWIND
+
+TYPO_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+REWIND_WORDS = 10
+
+PLAN_DTYPE = np.dtype([
+    ('op', np.uint8),
+    ('word', np.uint32),
+    ('aux', np.uint8),
+    ('wait', np.float64),   # seconds to wait after the action
+])
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class TypingPlan:
+    def __init__(self, words, actions, delay=None):
+        self.words = words
+        self.actions = actions
+        self.delay = delay
+
+    def __len__(self):
+        return len(self.actions)
+
+    def duration(self, start_delay=0):
+        # Total scheduled waiting time; emit cost comes on top of this
+        return start_delay + float(self.actions['wait'].sum())
+
+
+def compile_plan(words, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1, rng=None,
+                 typed=0):
+    # `rng` may be a seed or a numpy Generator; the same seed always gives the same plan.
+    # `typed` counts words already on screen before words[0].
+    rng = np.random.default_rng(rng)
+    n = len(words)
+    index = np.arange(n, dtype=np.uint32)
+
+    typo = rng.random(n) < typo_chance
+    typo_letter = rng.integers(0, len(TYPO_LETTERS), n, dtype=np.uint8)
+    pause = rng.random(n) < pause_chance
+    pause_length = rng.uniform(2, 5, n)
+    # Same rule as before: only rewind once more than REWIND_WORDS words are on screen
+    rewind = (rng.random(n) < delete_chance) & (typed + index >= REWIND_WORDS)
+
+    # Actions per word: [typo, delete] + write + [rewind + REWIND_WORDS retypes]
+    counts = 1 + 2 * typo + (1 + REWIND_WORDS) * rewind
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    actions = np.zeros(int(counts.sum()), dtype=PLAN_DTYPE)
+
+    t = starts[typo]
+    actions['op'][t] = OP_TYPO
+    actions['word'][t] = index[typo]
+    actions['aux'][t] = typo_letter[typo]
+    actions['wait'][t] = 0.5
+    actions['op'][t + 1] = OP_DELETE
+    actions['wait'][t + 1] = 0.7
+
+    w = starts + 2 * typo
+    actions['op'][w] = OP_WRITE
+    actions['word'][w] = index
+    actions['wait'][w] = delay + np.where(pause, pause_length, 0.0)
+
+    r = w[rewind] + 1
+    actions['op'][r] = OP_REWIND
+    actions['aux'][r] = REWIND_WORDS
+    actions['wait'][r] = 1.5
+    for k in range(REWIND_WORDS):
+        actions['op'][r + 1 + k] = OP_RETYPE
+        actions['wait'][r + 1 + k] = delay
+
+    return TypingPlan(words, actions, delay)
+
+
+# Streaming: type straight from disk without ever holding the whole document
+
+READ_BLOCK = 1 << 20
+CHUNK_WORDS = 4096
+WORD_PATTERN = re.compile(rb'\S+')
+
+
+def iter_words(path, block_size=READ_BLOCK):
+    # Yields the words of a UTF-8 file using a fixed-size read buffer
+    with open(path, 'rb') as file:
+        tail = b''
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            block = tail + block
+            # The last token may continue in the next block, so hold it back
+            cut = len(block)
+            while cut and not block[cut - 1:cut].isspace():
+                cut -= 1
+            tail = block[cut:]
+            for match in WORD_PATTERN.finditer(block, 0, cut):
+                yield match.group().decode('utf-8', errors='replace')
+        if tail:
+            yield tail.decode('utf-8', errors='replace')
+
+
+def iter_plans(words, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1, rng=None,
+               chunk_words=CHUNK_WORDS):
+    # Compiles an iterable of words into a sequence of bounded-size plans. Rewinds
+    # retype from the engine's ScreenModel, so chunks need no shared history.
+    rng = np.random.default_rng(rng)
+    typed = 0
+    chunk = []
+    for word in words:
+        chunk.append(word)
+        if len(chunk) == chunk_words:
+            yield compile_plan(chunk, delay, delete_chance, typo_chance, pause_chance, rng, typed)
+            typed += len(chunk)
+            chunk = []
+    if chunk:
+        yield compile_plan(chunk, delay, delete_chance, typo_chance, pause_chance, rng, typed)
+
+
+# Screen model: what the engine has typed so far, as far as rewinds need to know
+
+class ScreenModel:
+    # A cursor (characters on screen) plus a ring buffer of the last few tokens.
+    # Rewinds move tokens to `removed` and OP_RETYPE replays exactly those, so a
+    # rewind costs O(k) and memory stays bounded however long the document is.
+    def __init__(self, capacity=REWIND_WORDS + 1):
+        # One slot beyond REWIND_WORDS so a typo briefly on screen never evicts a word
+        self.tokens = deque(maxlen=capacity)
+        self.removed = []
+        self.cursor = 0
+
+    def emit(self, token):
+        self.tokens.append(token)
+        self.cursor += len(token)
+
+    def pop(self):
+        token = self.tokens.pop()
+        self.cursor -= len(token)
+        return token
+
+    def rewind(self, count):
+        # Returns how many tokens were actually removed
+        count = min(count, len(self.tokens))
+        self.removed = [self.pop() for _ in range(count)]
+        return count
+
+    def next_retype(self):
+        return self.removed.pop()
+
+
+# Max throughput mode: plain text in batches, no humanized behavior
+
+THROUGHPUT_BATCH_CHARS = 128
+# With a chars/sec target, batches are sized to about this much typing time
+THROUGHPUT_BATCH_SECONDS = 0.05
+
+
+# Scheduling: waits are measured against absolute deadlines, not chained sleeps
+
+# How far behind schedule the engine may fall before it stops trying to catch up
+MAX_LAG = 0.5
+
+
+class DeadlineScheduler:
+    # Each wait advances a deadline on the monotonic clock, so the time spent emitting
+    # and any oversleep are absorbed by the next wait instead of adding up
+    def __init__(self, stop, time_scale=1.0, clock=time.perf_counter):
+        self.stop = stop
+        self.time_scale = time_scale
+        self.clock = clock
+        self.start()
+
+    def start(self):
+        self.started = self.deadline = self.clock()
+        self.planned = 0.0
+        self.slept = 0.0
+        # Running jitter stats (Welford), so long sessions use constant memory
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.worst = 0.0
+
+    def record(self, lateness):
+        self.count += 1
+        delta = lateness - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (lateness - self.mean)
+        self.worst = max(self.worst, abs(lateness))
+
+    def wait(self, seconds):
+        # Returns True as soon as stop is requested
+        seconds *= self.time_scale
+        if seconds <= 0:
+            # Event.wait(0) still takes a lock; a plain check is enough here
+            return self.stop.is_set()
+        self.planned += seconds
+        self.deadline += seconds
+        before = self.clock()
+        if self.deadline - before > 0 and self.stop.wait(self.deadline - before):
+            self.slept += self.clock() - before
+            return True
+        now = self.clock()
+        self.slept += now - before
+        self.record(now - self.deadline)
+        # After a long stall (slow emit, machine busy) accept the drift rather than
+        # firing a burst of keystrokes to make up for it
+        self.deadline = max(self.deadline, now - MAX_LAG)
+        return self.stop.is_set()
+
+    def report(self):
+        elapsed = self.clock() - self.started
+        return {
+            "planned_seconds": self.planned,
+            "elapsed_seconds": elapsed,
+            "drift_seconds": elapsed - self.planned,
+            "slept_seconds": self.slept,
+            "waits": self.count,
+            "jitter_mean_ms": self.mean * 1000,
+            "jitter_stdev_ms": math.sqrt(self.m2 / self.count) * 1000 if self.count else 0.0,
+            "jitter_max_ms": self.worst * 1000,
+        }
+
+
+class TypingEngine:
+    def __init__(self, backend=None, stop=None, seed=None, time_scale=1.0):
+        self.backend = backend if backend is not None else PyAutoGUIBackend()
+        self.stop = stop if stop is not None else StopSignal()
+        self.rng = np.random.default_rng(seed)
+        # 0 skips every wait, which lets headless runs go at full speed
+        self.scheduler = DeadlineScheduler(self.stop, time_scale)
+        self.screen = ScreenModel()
+        self.stats = SessionStats()
+        # A typo is on screen and its correcting delete hasn't been sent yet
+        self.typo_pending = False
+        # Optional callable(engine), called after each source word (or batch) is typed
+        self.on_progress = None
+
+    def begin_session(self, requested_wpm=None, requested_cps=None):
+        self.scheduler.start()
+        self.screen = ScreenModel()
+        self.stats = SessionStats(requested_wpm, requested_cps)
+        self.typo_pending = False
+
+    def report(self):
+        return self.stats.report(self.scheduler)
+
+    def words_done(self):
+        # Source words fully on screen; words taken back by an unfinished rewind don't count
+        return self.stats.words - len(self.screen.removed)
+
+    def wait(self, seconds):
+        return self.scheduler.wait(seconds)
+
+    def write(self, text):
+        started = time.perf_counter()
+        self.backend.write(text)
+        self.wrote(started, text)
+
+    def wrote(self, started, text):
+        finished = time.perf_counter()
+        self.stats.record_emit(started, finished, len(text))
+        self.screen.emit(text)
+        self.stop.mark_emit(finished)
+
+    def hotkey(self, *keys, count=1):
+        started = time.perf_counter()
+        if count == 1:
+            self.backend.hotkey(*keys)
+        else:
+            self.backend.repeat_hotkey(count, *keys)
+        self.pressed(started)
+
+    def pressed(self, started):
+        finished = time.perf_counter()
+        self.stats.record_emit(started, finished)
+        self.stop.mark_emit(finished)
+
+    def delete_word(self):
+        self.hotkey('ctrl', 'backspace')
+        self.stats.backspaces += 1
+
+    # The session steps type through emit() and delete_steps(), which return what the
+    # driver has to wait out besides the plan's own delays. Here the backend blocks for
+    # its pauses itself, so there is nothing; the asyncio engine yields them instead.
+
+    def emit(self, text):
+        self.write(text)
+        return ()
+
+    def delete_steps(self):
+        self.delete_word()
+        return ()
+
+    def discard_typo(self):
+        # A stop between OP_TYPO and its OP_DELETE leaves the typo on screen; words_done()
+        # doesn't count it, so anything resuming from there needs it gone first
+        if self.typo_pending:
+            self.screen.pop()
+            self.delete_word()
+            self.typo_pending = False
+
+    def plan(self, content, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1):
+        return compile_plan(content.split(), delay, delete_chance, typo_chance, pause_chance, self.rng)
+
+    def run(self, content, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1, start_delay=3):
+        self.execute(self.plan(content, delay, delete_chance, typo_chance, pause_chance), start_delay)
+
+    def stream(self, path, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1, start_delay=3):
+        # Constant-memory variant of run() that reads the document from disk as it types
+        return self.stream_words(iter_words(path), delay, delete_chance, typo_chance, pause_chance, start_delay)
+
+    def stream_words(self, words, delay=0.3, delete_chance=0.15, typo_chance=0.03, pause_chance=0.1,
+                     start_delay=3):
+        # Types any iterable of words, compiling the plan chunk by chunk.
+        # Returns False if the run was stopped before all words were typed.
+        return self.drive(self.stream_steps(words, delay, delete_chance, typo_chance, pause_chance, start_delay))
+
+    def run_throughput(self, words, chars_per_second=0, start_delay=3):
+        # Coalesces words into large batched writes, paced to chars_per_second if given.
+        # Returns False if the run was stopped before all words were typed.
+        return self.drive(self.throughput_steps(words, chars_per_second, start_delay))
+
+    def execute(self, plan, start_delay=3, new_session=True):
+        # Returns False if the run was stopped before the plan finished
+        return self.drive(self.plan_steps(plan, start_delay, new_session))
+
+    def drive(self, steps):
+        # Waits out each delay the steps yield; the asyncio engine overrides only this
+        for wait in steps:
+            if self.wait(wait):
+                return False
+        return True
+
+    def progress(self):
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    # Session steps: generators that emit keystrokes and yield how long to wait next
+
+    def stream_steps(self, words, delay, delete_chance, typo_chance, pause_chance, start_delay):
+        plans = iter_plans(words, delay, delete_chance, typo_chance, pause_chance, self.rng)
+        new_session = True
+        for plan in plans:
+            yield from self.plan_steps(plan, start_delay, new_session)
+            start_delay = 0
+            new_session = False
+
+    def throughput_steps(self, words, chars_per_second, start_delay):
+        self.begin_session(requested_cps=chars_per_second or None)
+        yield start_delay
+
+        if chars_per_second:
+            batch_chars = max(1, int(chars_per_second * THROUGHPUT_BATCH_SECONDS))
+        else:
+            batch_chars = THROUGHPUT_BATCH_CHARS
+        batch = []
+        size = 0
+        for word in words:
+            batch.append(word)
+            size += len(word) + 1
+            if size >= batch_chars:
+                yield from self.emit_batch(batch, size, chars_per_second)
+                batch = []
+                size = 0
+        if batch:
+            yield from self.emit_batch(batch, size, chars_per_second)
+
+    def emit_batch(self, batch, size, chars_per_second):
+        yield from self.emit(' '.join(batch) + ' ')
+        self.stats.words += len(batch)
+        self.progress()
+        # Paces the batch (0 when unpaced)
+        yield size / chars_per_second if chars_per_second else 0
+
+    def plan_steps(self, plan, start_delay, new_session):
+        words = plan.words
+        if new_session:
+            self.begin_session(requested_wpm=60 / plan.delay if plan.delay else None)
+
+        stats = self.stats
+
+        # Give the user time to focus the target window
+        yield start_delay
+
+        for op, word, aux, wait in plan.actions.tolist():
+            if op == OP_WRITE:
+                yield from self.emit(words[word] + ' ')
+                stats.words += 1
+                self.progress()
+            elif op == OP_TYPO:
+                yield from self.emit(words[word][:-1] + TYPO_LETTERS[aux] + ' ')
+                stats.typos += 1
+                self.typo_pending = True
+            elif op == OP_DELETE:
+                self.screen.pop()
+                yield from self.delete_steps()
+                self.typo_pending = False
+            elif op == OP_REWIND:
+                for _ in range(self.screen.rewind(aux)):
+                    yield from self.delete_steps()
+                stats.rewinds += 1
+            elif op == OP_RETYPE:
+                if self.screen.removed:
+                    yield from self.emit(self.screen.next_retype())
+                    stats.retyped_words += 1
+            yield wait